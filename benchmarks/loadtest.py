@@ -0,0 +1,338 @@
+"""./benchmarks/loadtest
+
+HTTP load test of the citenote routes.
+
+The application is built with ``create_app()`` against the database of config.json and served by a threaded werkzeug
+server on a free local port (or ``--url`` points at a server started elsewhere, e.g. uvicorn). Fixture rows named
+"loadtest ..." are created once and reused. A fixed number of client threads then send requests picked from a
+weighted mix of routes for ``--duration`` seconds, every thread with its own keep-alive connection.
+
+Throughput and p50/p95/p99 latency of every route are printed and written as json to ``--output``.
+
+Mixes are given by name (see MIXES) or as ``route=weight`` pairs, routes are the keys of ROUTES:
+
+    python benchmarks/loadtest.py --mix read --concurrency 8 --duration 30
+    python benchmarks/loadtest.py --mix "papers.get=3,papers.post=1" --output papers.json
+
+Papers written by the "papers.post" route are removed with ``--cleanup``.
+"""
+
+import argparse
+import collections
+import http.client
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import uuid
+from typing import Callable, NamedTuple
+from urllib.parse import quote, urlencode, urlsplit
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIXTURE_PREFIX = "loadtest"
+FIXTURE_ABSTRACT = "Load test fixture about citation graphs, bibliography management and reference parsing."
+FIXTURE_USERNAME = "loadtest"
+FIXTURE_PASSWORD = "loadtest-password"  # nosec
+SEARCH_TERMS = ("citation", "bibliography", "reference parsing", "graphs", "management")
+PAGE_LIMIT = 50
+
+
+class Fixtures(NamedTuple):
+    """Database rows the requests refer to"""
+
+    username: str
+    password: str
+    paper_ids: list[int]
+    paper_names: list[str]
+    manuscript_id: int
+
+
+class Request(NamedTuple):
+    method: str
+    path: str
+    form: dict | None = None
+
+
+def write_paper(fixtures: Fixtures, rng: random.Random) -> Request:
+    name = f"{FIXTURE_PREFIX} write {uuid.uuid4()}"
+    return Request("POST", "/papers/", {"paper_name": name, "paper_abstract": FIXTURE_ABSTRACT})
+
+
+# Request builders by route name (blueprint.route)
+ROUTES: dict[str, Callable[[Fixtures, random.Random], Request]] = {
+    "users.login": lambda f, rng: Request(
+        "GET", "/users/login?" + urlencode({"username": f.username, "password": f.password})
+    ),
+    "users.user": lambda f, rng: Request("GET", f"/users/user/{quote(f.username)}"),
+    "papers.get": lambda f, rng: Request("GET", "/papers/", {"paper_name": rng.choice(f.paper_names)}),
+    "papers.paper": lambda f, rng: Request("GET", f"/papers/paper/{rng.choice(f.paper_ids)}"),
+    "papers.search": lambda f, rng: Request(
+        "GET", "/papers/search?" + urlencode({"q": rng.choice(SEARCH_TERMS), "limit": PAGE_LIMIT})
+    ),
+    "papers.post": write_paper,
+    "manuscripts.list": lambda f, rng: Request("GET", f"/manuscripts/?limit={PAGE_LIMIT}"),
+    "manuscripts.papers": lambda f, rng: Request(
+        "GET", f"/manuscripts/{f.manuscript_id}/add_paper/?limit={PAGE_LIMIT}"
+    ),
+}
+
+MIXES = {
+    "read": "users.user=1,papers.get=4,papers.paper=3,papers.search=2,manuscripts.list=1,manuscripts.papers=2",
+    "write": "papers.post=1,papers.get=3,papers.search=1",
+    "login": "users.login=1",
+    "all": ",".join(f"{route}=1" for route in ROUTES),
+}
+
+
+def parse_mix(mix: str) -> dict[str, float]:
+    """Returns weights by route from mix name or "route=weight" pairs"""
+
+    weights = {}
+    for pair in MIXES.get(mix, mix).split(","):
+        route, _, weight = pair.strip().partition("=")
+        if route not in ROUTES:
+            raise SystemExit(f"Unknown route {route!r}, expected one of: {', '.join(ROUTES)}")
+        weights[route] = float(weight or 1)
+
+    return weights
+
+
+def seed(app, papers: int) -> Fixtures:
+    """Creates fixture user, papers and manuscript if missing
+
+    Args:
+        app (Flask): Application built by create_app.
+        papers (int): Number of fixture papers.
+
+    Returns:
+        (Fixtures): Fixture rows.
+
+    """
+
+    from sqlalchemy import select
+    from sqlalchemy.dialects.postgresql import insert
+
+    from server.models.data_models import Manuscript, Paper, db, manuscript_paper
+    from server.util.helper.helper_papers import insert_papers
+
+    app.test_client().get(
+        "/users/register?" + urlencode({"username": FIXTURE_USERNAME, "password": FIXTURE_PASSWORD}),
+        environ_base={"REMOTE_PORT": "0"},
+    )
+
+    names = [f"{FIXTURE_PREFIX} paper {index}" for index in range(papers)]
+    with app.app_context():
+        insert_papers([{"name": name, "abstract": FIXTURE_ABSTRACT} for name in names])
+        ids = list(db.session.scalars(select(Paper.id).where(Paper.name.in_(names)).order_by(Paper.id)))
+
+        manuscript = Manuscript.query.filter_by(name=f"{FIXTURE_PREFIX} manuscript").first()
+        if manuscript is None:
+            manuscript = Manuscript(f"{FIXTURE_PREFIX} manuscript", FIXTURE_ABSTRACT)
+            db.session.add(manuscript)
+            db.session.flush()
+
+        links = [{"manuscript_id": manuscript.id, "paper_id": id} for id in ids]
+        db.session.execute(insert(manuscript_paper).values(links).on_conflict_do_nothing())
+        db.session.commit()
+
+        return Fixtures(FIXTURE_USERNAME, FIXTURE_PASSWORD, ids, names, manuscript.id)
+
+
+def cleanup(app) -> int:
+    """Deletes papers written by the load test, returns their number"""
+
+    from sqlalchemy import delete
+
+    from server.models.data_models import Paper, db
+
+    with app.app_context():
+        result = db.session.execute(delete(Paper).where(Paper.name.startswith(f"{FIXTURE_PREFIX} write ")))
+        db.session.commit()
+        return result.rowcount
+
+
+def start_server(app) -> tuple[str, Callable[[], None]]:
+    """Serves app with threaded werkzeug server on free local port
+
+    Returns:
+        (tuple): Base url and function stopping the server.
+
+    """
+
+    from werkzeug.serving import make_server
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, name="loadtest-server", daemon=True)
+    thread.start()
+
+    def stop():
+        server.shutdown()
+        thread.join()
+
+    return f"http://127.0.0.1:{server.server_port}", stop
+
+
+class Worker(threading.Thread):
+    """Client thread sending requests over one connection until deadline
+
+    Attributes:
+        samples (list): Route, status and latency in seconds of every request sent after warmup. Status 0 is a
+            connection error.
+
+    """
+
+    def __init__(
+        self, url: str, fixtures: Fixtures, weights: dict, start: float, warmup: float, deadline: float, seed: int
+    ) -> None:
+        super().__init__(name=f"loadtest-client-{seed}", daemon=True)
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port
+        self.fixtures = fixtures
+        self.routes, self.weights = list(weights), list(weights.values())
+        self.start_at, self.warmup, self.deadline = start, warmup, deadline
+        self.rng = random.Random(seed)
+        self.samples: list[tuple[str, int, float]] = []
+
+    def send(self, connection: http.client.HTTPConnection, request: Request) -> int:
+        body, headers = None, {}
+        if request.form is not None:
+            body = urlencode(request.form)
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+
+        connection.request(request.method, request.path, body=body, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        return response.status
+
+    def run(self) -> None:
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        while time.perf_counter() < self.start_at:
+            time.sleep(0.001)
+
+        while (started := time.perf_counter()) < self.deadline:
+            route = self.rng.choices(self.routes, self.weights)[0]
+            try:
+                status = self.send(connection, ROUTES[route](self.fixtures, self.rng))
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                status = 0
+
+            if started >= self.warmup:
+                self.samples.append((route, status, time.perf_counter() - started))
+
+        connection.close()
+
+
+def percentile(quantiles: list[float], value: int) -> float:
+    return quantiles[value - 1] if quantiles else 0.0
+
+
+def summarize(samples: list[tuple[str, int, float]], elapsed: float) -> dict:
+    """Returns throughput, status codes and latency percentiles in milliseconds"""
+
+    latencies = [latency * 1000 for _, _, latency in samples]
+    statuses = collections.Counter(status for _, status, _ in samples)
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+
+    return {
+        "requests": len(samples),
+        "errors": sum(count for status, count in statuses.items() if status == 0 or status >= 500),
+        "throughput_rps": len(samples) / elapsed if elapsed else 0.0,
+        "status": {str(status): count for status, count in sorted(statuses.items())},
+        "latency_ms": {
+            "mean": statistics.fmean(latencies) if latencies else 0.0,
+            "p50": percentile(quantiles, 50),
+            "p95": percentile(quantiles, 95),
+            "p99": percentile(quantiles, 99),
+            "max": max(latencies, default=0.0),
+        },
+    }
+
+
+def run(
+    url: str, fixtures: Fixtures, weights: dict, concurrency: int, duration: float, warmup: float, seed: int
+) -> dict:
+    """Runs load test and returns summary of every route and of all requests"""
+
+    start = time.perf_counter() + 0.1
+    workers = [
+        Worker(url, fixtures, weights, start, start + warmup, start + warmup + duration, seed + index)
+        for index in range(concurrency)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    samples = [sample for worker in workers for sample in worker.samples]
+    by_route = collections.defaultdict(list)
+    for sample in samples:
+        by_route[sample[0]].append(sample)
+
+    return {
+        "routes": {route: summarize(by_route[route], duration) for route in weights if by_route[route]},
+        "total": summarize(samples, duration),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="HTTP load test of citenote routes")
+    parser.add_argument("--mix", default="read", help=f"Mix name ({', '.join(MIXES)}) or route=weight pairs")
+    parser.add_argument("--concurrency", type=int, default=8, help="Client threads (default=8)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds (default=10)")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Seconds before measuring (default=2)")
+    parser.add_argument("--papers", type=int, default=1000, help="Fixture papers (default=1000)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of first client (default=0)")
+    parser.add_argument("--url", help="Base url of running server, app is served in process if omitted")
+    parser.add_argument("--output", default="loadtest.json", help="Json results file (default=loadtest.json)")
+    parser.add_argument("--cleanup", action="store_true", help="Delete papers written by the test afterwards")
+    args = parser.parse_args()
+
+    weights = parse_mix(args.mix)
+
+    sys.path.insert(0, ROOT)
+    from server import create_app
+
+    app = create_app()
+    fixtures = seed(app, args.papers)
+
+    url, stop = (args.url.rstrip("/"), lambda: None) if args.url else start_server(app)
+    try:
+        results = run(url, fixtures, weights, args.concurrency, args.duration, args.warmup, args.seed)
+    finally:
+        stop()
+
+    if args.cleanup:
+        print(f"Deleted {cleanup(app)} written papers.")
+
+    results = {
+        "python": sys.version.split()[0],
+        "url": args.url or "in-process",
+        "mix": weights,
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "warmup": args.warmup,
+        **results,
+    }
+
+    print(f"{'route':<22} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for route, summary in [*results["routes"].items(), ("total", results["total"])]:
+        latency = summary["latency_ms"]
+        print(
+            f"{route:<22} {summary['requests']:>9} {summary['errors']:>7} {summary['throughput_rps']:>9.1f} "
+            f"{latency['p50']:>9.2f} {latency['p95']:>9.2f} {latency['p99']:>9.2f}"
+        )
+
+    with open(args.output, "w") as output_file:
+        json.dump(results, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""./benchmarks/micro
+
+Micro-benchmarks of the helper hot paths.
+
+Helpers run in process without a database: configuration is read from config.json in the repository root, request
+data comes from a test request context of a bare flask app, models are transient objects. Every benchmark is timed
+with ``timeit`` autorange (at least 0.2 s per round), the fastest round is compared.
+
+Results are written as json to ``--output``. With ``--baseline`` they are compared against an earlier results file
+and the script exits with 1 if any benchmark is slower by more than ``--threshold``; ``--save`` stores the results
+as the new baseline instead:
+
+    python benchmarks/micro.py --save
+    python benchmarks/micro.py --threshold 0.15
+    python benchmarks/micro.py --filter hash
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import sys
+import timeit
+from typing import Callable
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "micro_baseline.json")
+DEFAULT_THRESHOLD = 0.10
+
+ARTICLE_FORM = {
+    "paper_type": "article",
+    "author": "Ada Lovelace and Charles Babbage",
+    "journal": "Scientific Memoirs",
+    "year": "1843",
+    "volume": "3",
+    "pages": "666--731",
+    "note": "Translated with notes",
+}
+
+# Setup functions by benchmark name, a setup returns the function to time
+BENCHMARKS: dict[str, Callable[[contextlib.ExitStack], Callable[[], object]]] = {}
+
+
+def benchmark(name: str) -> Callable:
+    def decorator(setup: Callable) -> Callable:
+        BENCHMARKS[name] = setup
+        return setup
+
+    return decorator
+
+
+def request_context(stack: contextlib.ExitStack, **kwargs) -> None:
+    """Enters test request context of a bare flask app until benchmark ends"""
+
+    from flask import Flask
+
+    stack.enter_context(Flask(__name__).test_request_context(**kwargs))
+
+
+@benchmark("model_formatter")
+def bench_model_formatter(stack):
+    from server.models.data_models import Paper
+    from server.util.helper.helper_models import model_formatter
+
+    paper = Paper("On the analytical engine", "Notes on the engine.")
+    paper.id = 1
+    return lambda: model_formatter(paper)
+
+
+@benchmark("model_formatter[list of 100]")
+def bench_model_formatter_list(stack):
+    from server.models.data_models import Paper
+    from server.util.helper.helper_models import model_formatter
+
+    papers = [Paper(f"Paper {index}", "Abstract") for index in range(100)]
+    for index, paper in enumerate(papers):
+        paper.id = index
+    return lambda: [model_formatter(paper) for paper in papers]
+
+
+@benchmark("row_formatter[list of 100]")
+def bench_row_formatter_list(stack):
+    from sqlalchemy import create_engine, text
+
+    from server.util.helper.helper_models import row_formatter
+
+    # Rows as selected by list routes, read from in-memory sqlite
+    with create_engine("sqlite://").connect() as connection:
+        rows = connection.execute(
+            text(
+                "WITH RECURSIVE ids(id) AS (SELECT 0 UNION ALL SELECT id + 1 FROM ids WHERE id < 99) "
+                "SELECT id, 'Paper ' || id AS name, 'Abstract' AS abstract FROM ids"
+            )
+        ).all()
+    return lambda: [row_formatter(row) for row in rows]
+
+
+@benchmark("replace_check[update]")
+def bench_replace_check(stack):
+    from server.util.helper.helper_models import replace_check
+
+    return lambda: replace_check(False, updated_name="New name")
+
+
+@benchmark("replace_check[rejected]")
+def bench_replace_check_rejected(stack):
+    from server.util.helper.helper_models import replace_check
+
+    return lambda: replace_check(True, updated_name="New name")
+
+
+@benchmark("update_field")
+def bench_update_field(stack):
+    from server.util.helper.helper_models import update_field
+
+    return lambda: update_field("Old name", "name", "New name")
+
+
+@benchmark("get_schema")
+def bench_get_schema(stack):
+    from server.util.schemas import get_schema
+
+    return lambda: get_schema("Article")
+
+
+@benchmark("get_citation")
+def bench_get_citation(stack):
+    from server.util.helper.helper_citations import get_citation
+
+    request_context(stack, method="POST", data=ARTICLE_FORM)
+    return lambda: get_citation("article")
+
+
+@benchmark("role_validator")
+def bench_role_validator(stack):
+    from server.util.helper.helper_users import role_validator
+
+    return lambda: role_validator("guest")
+
+
+@benchmark("error_handler")
+def bench_error_handler(stack):
+    from werkzeug.exceptions import NotFound
+
+    from server import error_handler
+
+    err = NotFound("Manuscript not found in database.")
+    return lambda: error_handler(err)
+
+
+def bench_json_response(stack, provider_class):
+    from flask import Flask
+
+    app = Flask(__name__)
+    app.config["JSON_SORT_KEYS"] = False
+    # Provider holds weak reference, app context keeps app alive until benchmark ends
+    stack.enter_context(app.app_context())
+    provider = provider_class(app)
+    rows = [{"id": index, "name": f"Paper {index}", "abstract": "Abstract " * 20} for index in range(500)]
+    body = {"count": len(rows), "results": rows, "next": None}
+    return lambda: provider.response(body)
+
+
+@benchmark("json_response[default, 500 rows]")
+def bench_json_response_default(stack):
+    from flask.json.provider import DefaultJSONProvider
+
+    return bench_json_response(stack, DefaultJSONProvider)
+
+
+@benchmark("json_response[orjson, 500 rows]")
+def bench_json_response_orjson(stack):
+    from server.util.json_provider import OrjsonProvider, orjson
+
+    if orjson is None:
+        raise SystemExit("orjson is not installed, skip with --filter")
+    return bench_json_response(stack, OrjsonProvider)
+
+
+@benchmark("citenote_check_hash")
+def bench_check_hash(stack):
+    from server.util.helper.helper_main import citenote_check_hash, citenote_gen_hash
+
+    hash = citenote_gen_hash("password")
+    return lambda: citenote_check_hash("password", hash)
+
+
+def measure(func: Callable[[], object], repeat: int) -> dict:
+    """Times func, returns calls per round and nanoseconds per call"""
+
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    times = [total / number * 1e9 for total in timer.repeat(repeat, number)]
+    return {
+        "number": number,
+        "min_ns": min(times),
+        "median_ns": statistics.median(times),
+    }
+
+
+def run(names: list[str], repeat: int) -> dict:
+    """Runs benchmarks, returns their timings by name"""
+
+    from server.util.registry import registry
+
+    registry.load()
+
+    results = {}
+    for name in names:
+        with contextlib.ExitStack() as stack:
+            results[name] = measure(BENCHMARKS[name](stack), repeat)
+
+    return results
+
+
+def compare(results: dict, baseline: dict) -> dict:
+    """Returns relative change of fastest round against baseline, for benchmarks present in both"""
+
+    return {
+        name: result["min_ns"] / baseline[name]["min_ns"] - 1
+        for name, result in results.items()
+        if name in baseline and baseline[name]["min_ns"]
+    }
+
+
+def format_ns(ns: float) -> str:
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("us", 1e3)):
+        if ns >= scale:
+            return f"{ns / scale:.2f} {unit}"
+
+    return f"{ns:.0f} ns"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks of citenote helpers")
+    parser.add_argument("--filter", default="", help="Run benchmarks whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed rounds per benchmark (default=5)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline results file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"Allowed slowdown against baseline, 0.1 is 10%% (default={DEFAULT_THRESHOLD})",
+    )
+    parser.add_argument("--save", action="store_true", help="Store results as baseline instead of comparing")
+    parser.add_argument("--output", help="Write results as json to this file")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+
+    names = [name for name in BENCHMARKS if args.filter in name]
+    results = {"python": sys.version.split()[0], "benchmarks": run(names, args.repeat)}
+
+    baseline = {}
+    if not args.save and os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)["benchmarks"]
+
+    changes = compare(results["benchmarks"], baseline)
+    regressions = [name for name, change in changes.items() if change > args.threshold]
+
+    print(f"{'benchmark':<32} {'time':>10} {'baseline':>10} {'change':>8}")
+    for name, result in results["benchmarks"].items():
+        reference = format_ns(baseline[name]["min_ns"]) if name in changes else "-"
+        change = f"{changes[name]:+.1%}" if name in changes else "-"
+        mark = "  REGRESSION" if name in regressions else ""
+        print(f"{name:<32} {format_ns(result['min_ns']):>10} {reference:>10} {change:>8}{mark}")
+
+    results["regressions"] = regressions
+    for path in filter(None, (args.output, args.baseline if args.save else None)):
+        with open(path, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+
+    if args.save:
+        print(f"\nBaseline saved to {args.baseline}")
+    elif not baseline:
+        print(f"\nNo baseline at {args.baseline}, run with --save to create it")
+    elif regressions:
+        print(f"\n{len(regressions)} benchmarks slower than baseline by more than {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
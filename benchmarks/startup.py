@@ -0,0 +1,158 @@
+"""./benchmarks/startup
+
+Measures cold start of the citenote application.
+
+Two measurements are taken in fresh interpreters, so nothing is cached between runs:
+    - Import time of every module loaded by ``import server`` (``python -X importtime``).
+    - Time to import the package, build the app with ``create_app()`` and serve the first request.
+
+Run from the repository root, where config.json is present:
+
+    python benchmarks/startup.py --runs 5 --output startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess  # nosec
+import sys
+import time
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+    """Runs python interpreter from repository root"""
+
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    return subprocess.run(  # nosec
+        [sys.executable, *args],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def parse_importtime(stderr: str) -> list[dict]:
+    """Parses output of ``-X importtime``
+
+    Args:
+        stderr (str): Standard error of interpreter.
+
+    Returns:
+        modules (list): Dictionaries with module name, self and cumulative time in milliseconds.
+
+    """
+
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append(
+            {
+                "module": name.strip(),
+                "depth": (len(name) - len(name.lstrip())) // 2,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+            }
+        )
+
+    return modules
+
+
+def measure_imports(target: str = "server") -> list[dict]:
+    """Returns import times of all modules loaded by target"""
+
+    result = run_python("-X", "importtime", "-c", f"import {target}")
+    return parse_importtime(result.stderr)
+
+
+def measure_cold_start(path: str) -> dict:
+    """Returns timings of a single cold start measured in fresh interpreter"""
+
+    result = run_python(os.path.abspath(__file__), "--child", "--path", path)
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def child(path: str) -> None:
+    """Runs inside fresh interpreter, prints timings as json"""
+
+    start = time.perf_counter()
+    from server import create_app
+
+    imported = time.perf_counter()
+    app = create_app()
+    created = time.perf_counter()
+
+    response = app.test_client().get(path, environ_base={"REMOTE_PORT": "0"})
+    served = time.perf_counter()
+
+    print(
+        json.dumps(
+            {
+                "import_ms": (imported - start) * 1000,
+                "create_app_ms": (created - imported) * 1000,
+                "first_request_ms": (served - created) * 1000,
+                "time_to_first_request_ms": (served - start) * 1000,
+                "status": response.status_code,
+            }
+        )
+    )
+
+
+def summarize(runs: list[dict]) -> dict:
+    """Returns median and max of every timing"""
+
+    keys = [key for key in runs[0] if key.endswith("_ms")]
+    return {
+        key: {
+            "median": statistics.median(run[key] for run in runs),
+            "max": max(run[key] for run in runs),
+        }
+        for key in keys
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Cold start benchmark for create_app")
+    parser.add_argument("--runs", type=int, default=5, help="Number of cold starts (default=5)")
+    parser.add_argument("--path", default="/", help="Path of first request (default=/)")
+    parser.add_argument("--top", type=int, default=20, help="Number of slowest modules to print (default=20)")
+    parser.add_argument("--output", help="Write results as json to this file")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.path)
+        return
+
+    modules = measure_imports()
+    runs = [measure_cold_start(args.path) for _ in range(args.runs)]
+    results = {
+        "python": sys.version.split()[0],
+        "runs": runs,
+        "summary": summarize(runs),
+        "imports": sorted(modules, key=lambda module: module["cumulative_ms"], reverse=True),
+    }
+
+    print(f"{'module':<50} {'self ms':>10} {'cumul. ms':>10}")
+    for module in sorted(modules, key=lambda module: module["self_ms"], reverse=True)[: args.top]:
+        print(f"{module['module']:<50} {module['self_ms']:>10.2f} {module['cumulative_ms']:>10.2f}")
+
+    print()
+    for key, value in results["summary"].items():
+        print(f"{key:<30} median {value['median']:>9.2f} ms    max {value['max']:>9.2f} ms")
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
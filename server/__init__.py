@@ -1,12 +1,18 @@
 from typing import Tuple
 
 from flask import Flask
+from werkzeug.exceptions import ServiceUnavailable
 
 from .routes import home, manuscripts, papers, users
 from .util import set_config as config
+from .util.cache import invalidate_config
 from .util.db import init_dbs
-from .util.helper import create_admin, init_db
-from .util.logger import logger_citenote
+from .util.helper import create_admin, export_bibtex_file, import_bibtex_file, init_db, migrate_db
+from .util.logger import configure_logging, logger_citenote, start_timer
+from .util.metrics import record_request, start_request
+from .util.profiler import finish_profile, load_profile_settings, start_profile, stop_profile
+from .util.queries import finish_queries, listen_queries, load_query_settings, reset_queries, start_queries
+from .util.registry import registry
 
 
 def error_handler(err: int) -> Tuple[dict, int]:
@@ -18,21 +24,51 @@ def error_handler(err: int) -> Tuple[dict, int]:
     }, status
 
 
+def unavailable_handler(err: ServiceUnavailable) -> Tuple[dict, int, dict]:
+    body, status = error_handler(err)
+    return body, status, {key: value for key, value in err.get_headers() if key == "Retry-After"}
+
+
 def create_app() -> Flask:
     app = Flask(__name__, instance_relative_config=True)
 
+    registry.load()
+    registry.install_signal_handler()
+    registry.add_listener(invalidate_config)
+    registry.add_listener(load_query_settings)
+    registry.add_listener(load_profile_settings)
+    configure_logging()
+    load_profile_settings()
+
+    # Registered first, so profile covers other request hooks
+    app.before_request(start_profile)
+    app.after_request(finish_profile)
+    app.teardown_request(stop_profile)
+
+    app.before_request(start_timer)
+    app.before_request(start_request)
     app.after_request(logger_citenote)
+    app.after_request(record_request)
+    app.before_request(start_queries)
+    app.after_request(finish_queries)
+    app.teardown_request(reset_queries)
 
+    app.register_error_handler(400, error_handler)
     app.register_error_handler(401, error_handler)
     app.register_error_handler(404, error_handler)
+    app.register_error_handler(503, unavailable_handler)
 
     app.cli.add_command(init_db)
     app.cli.add_command(create_admin)
+    app.cli.add_command(migrate_db)
+    app.cli.add_command(import_bibtex_file)
+    app.cli.add_command(export_bibtex_file)
 
     with app.app_context():
         config.configure()
 
     init_dbs(app)
+    listen_queries()
 
     app.register_blueprint(home._home)
     app.register_blueprint(users._users)
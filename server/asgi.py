@@ -0,0 +1,132 @@
+"""./server/asgi
+
+ASGI entry point of citenote:
+
+    uvicorn server.asgi:app
+
+With "async_mode": true in config.json, read routes in ASYNC_ROUTES are served by async helpers on asyncpg, so slow
+clients and database round trips do not hold worker threads. All other requests, and every request while async mode
+is off, are passed to the flask application, which runs in a pool of ``asgi_threads`` threads (see util.wsgi).
+
+Requests with a body (e.g. "manuscript_name" form of GET /manuscripts/) always go to the flask application. Async
+routes do not use the response cache.
+"""
+
+import time
+
+from flask import Flask
+from werkzeug.exceptions import HTTPException
+from werkzeug.routing import Map, Rule
+from werkzeug.urls import url_decode
+
+from . import create_app, error_handler
+from .util.helper.helper_async import dispose_async_engine, get_manuscripts, get_papers, search_papers
+from .util.logger import log_access
+from .util.metrics import request_metrics
+from .util.registry import registry
+from .util.wsgi import PooledWsgiToAsgi, get_threads
+
+
+ASYNC_ROUTES = Map(
+    [
+        Rule("/manuscripts/", endpoint=get_manuscripts, methods=("GET",)),
+        Rule("/manuscripts/<int:manuscript_id>/add_paper/", endpoint=get_papers, methods=("GET",)),
+        Rule("/papers/search", endpoint=search_papers, methods=("GET",)),
+    ]
+)
+
+
+def is_async_mode() -> bool:
+    """Returns True if async mode is enabled in config.json"""
+
+    return bool(registry.get("config").get("async_mode", False))
+
+
+class CitenoteASGI:
+    """ASGI application serving async routes natively and everything else through flask
+
+    Attributes:
+        flask_app (Flask): Flask application.
+        wsgi (PooledWsgiToAsgi): Flask application adapted to ASGI.
+
+    """
+
+    def __init__(self, flask_app: Flask) -> None:
+        self.flask_app = flask_app
+        self.wsgi = PooledWsgiToAsgi(flask_app, get_threads())
+        self.routes = ASYNC_ROUTES.bind("localhost")
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+            return
+
+        if scope["type"] == "http" and is_async_mode():
+            match = self.match(scope)
+            if match is not None:
+                await self.serve(scope, send, *match)
+                return
+
+        await self.wsgi(scope, receive, send)
+
+    def match(self, scope) -> tuple | None:
+        """Returns rule of async endpoint and its arguments or None if request goes to flask"""
+
+        headers = dict(scope["headers"])
+        if headers.get(b"content-length", b"0") != b"0" or b"transfer-encoding" in headers:
+            return None
+
+        try:
+            return self.routes.match(scope["path"], scope["method"], return_rule=True)
+        except HTTPException:
+            return None
+
+    async def serve(self, scope, send, rule: Rule, values: dict) -> None:
+        """Runs async endpoint and sends its json response"""
+
+        start = time.perf_counter()
+        query = scope["query_string"].decode("latin-1")
+        request_metrics.start()
+
+        try:
+            body, status = await rule.endpoint(args=url_decode(query), **values)
+        except HTTPException as err:
+            body, status = error_handler(err)
+
+        # Same encoding as json responses of flask application
+        payload = self.flask_app.json.response(body).get_data()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(payload)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": b"" if scope["method"] == "HEAD" else payload})
+
+        # Blueprint of async routes is their first path segment, same as in flask application
+        request_metrics.record(
+            rule.rule.strip("/").split("/")[0], rule.rule, scope["method"], status, time.perf_counter() - start
+        )
+
+        client = scope.get("client")
+        log_access(client[0] if client else None, scope["method"], scope["path"], query, status, start)
+
+    async def lifespan(self, receive, send) -> None:
+        """Handles startup and shutdown of ASGI server"""
+
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await dispose_async_engine()
+                self.wsgi.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+app = CitenoteASGI(create_app())
@@ -0,0 +1,5 @@
+from flask_sqlalchemy import SQLAlchemy
+
+
+# Shared by all models, so the application holds a single engine and connection pool
+db = SQLAlchemy()
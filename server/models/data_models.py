@@ -1,13 +1,12 @@
-from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.dialects.postgresql import TSVECTOR
 
-
-db = SQLAlchemy()
+from .base import db
 
 
 manuscript_paper = db.Table(
     "manuscripts_papers",
-    db.Column("manuscript_id", db.Integer, db.ForeignKey("manuscripts.id")),
-    db.Column("paper_id", db.Integer, db.ForeignKey("papers.id")),
+    db.Column("manuscript_id", db.Integer, db.ForeignKey("manuscripts.id"), primary_key=True),
+    db.Column("paper_id", db.Integer, db.ForeignKey("papers.id"), primary_key=True, index=True),
 )
 
 
@@ -30,6 +29,8 @@ class Paper(db.Model):  # type: ignore
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String, unique=True, nullable=False)
     abstract = db.Column(db.String)
+    # Maintained by triggers of migration 0002_papers_search_vector.sql
+    search_vector = db.deferred(db.Column(TSVECTOR))
     bibtex = db.relationship("Citation", backref="papers", uselist=False)
 
     def __init__(self, name, abstract):
@@ -65,7 +66,7 @@ class Citation(db.Model):  # type: ignore
     title = db.Column(db.String)
     volume = db.Column(db.String)
     year = db.Column(db.String)
-    paper_id = db.Column(db.Integer, db.ForeignKey("papers.id"))
+    paper_id = db.Column(db.Integer, db.ForeignKey("papers.id"), index=True)
 
     def __init__(self, title, paper_id, **kwargs):
         self.title = title
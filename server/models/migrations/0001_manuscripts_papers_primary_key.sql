@@ -0,0 +1,21 @@
+-- Composite primary key on manuscripts_papers.
+-- Incomplete and duplicate associations are removed first, as primary key does not allow them.
+
+DELETE FROM manuscripts_papers WHERE manuscript_id IS NULL OR paper_id IS NULL;
+
+DELETE FROM manuscripts_papers a
+    USING manuscripts_papers b
+    WHERE a.ctid < b.ctid
+        AND a.manuscript_id = b.manuscript_id
+        AND a.paper_id = b.paper_id;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint WHERE conrelid = 'manuscripts_papers'::regclass AND contype = 'p'
+    ) THEN
+        ALTER TABLE manuscripts_papers ADD PRIMARY KEY (manuscript_id, paper_id);
+    END IF;
+END $$;
+
+CREATE INDEX IF NOT EXISTS ix_manuscripts_papers_paper_id ON manuscripts_papers (paper_id);
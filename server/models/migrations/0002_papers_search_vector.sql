@@ -0,0 +1,60 @@
+-- Full-text search over papers.
+-- papers.search_vector holds name (weight A), author/title/journal of citations (weight B) and abstract (weight C).
+-- It is kept current by triggers on papers and citations and searched through a GIN index.
+
+ALTER TABLE papers ADD COLUMN IF NOT EXISTS search_vector tsvector;
+
+-- Search vector of a paper is built from its citations
+CREATE INDEX IF NOT EXISTS ix_citations_paper_id ON citations (paper_id);
+
+CREATE OR REPLACE FUNCTION citenote_paper_search_vector(paper_id integer, name varchar, abstract varchar)
+RETURNS tsvector LANGUAGE sql STABLE AS $$
+    SELECT setweight(to_tsvector('english', coalesce(name, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(string_agg(concat_ws(' ', c.author, c.title, c.journal), ' '), '')), 'B')
+        || setweight(to_tsvector('english', coalesce(abstract, '')), 'C')
+    FROM citations c
+    WHERE c.paper_id = $1
+$$;
+
+CREATE OR REPLACE FUNCTION citenote_papers_search_trigger() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.search_vector := citenote_paper_search_vector(NEW.id, NEW.name, NEW.abstract);
+    RETURN NEW;
+END $$;
+
+-- Statement level, so bulk citation inserts refresh every affected paper once
+CREATE OR REPLACE FUNCTION citenote_citations_search_trigger() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE papers p SET search_vector = citenote_paper_search_vector(p.id, p.name, p.abstract)
+            WHERE p.id IN (SELECT paper_id FROM new_rows);
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE papers p SET search_vector = citenote_paper_search_vector(p.id, p.name, p.abstract)
+            WHERE p.id IN (SELECT paper_id FROM old_rows);
+    END IF;
+    RETURN NULL;
+END $$;
+
+DROP TRIGGER IF EXISTS papers_search_vector ON papers;
+CREATE TRIGGER papers_search_vector BEFORE INSERT OR UPDATE OF name, abstract ON papers
+    FOR EACH ROW EXECUTE FUNCTION citenote_papers_search_trigger();
+
+DROP TRIGGER IF EXISTS citations_search_vector_insert ON citations;
+CREATE TRIGGER citations_search_vector_insert AFTER INSERT ON citations
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION citenote_citations_search_trigger();
+
+DROP TRIGGER IF EXISTS citations_search_vector_update ON citations;
+CREATE TRIGGER citations_search_vector_update AFTER UPDATE ON citations
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION citenote_citations_search_trigger();
+
+DROP TRIGGER IF EXISTS citations_search_vector_delete ON citations;
+CREATE TRIGGER citations_search_vector_delete AFTER DELETE ON citations
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION citenote_citations_search_trigger();
+
+UPDATE papers SET search_vector = citenote_paper_search_vector(id, name, abstract);
+
+CREATE INDEX IF NOT EXISTS ix_papers_search_vector ON papers USING gin (search_vector);
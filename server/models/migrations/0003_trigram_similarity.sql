@@ -0,0 +1,32 @@
+-- Trigram similarity of paper names and citation titles, used to find near-duplicate papers.
+-- Names are compared after citenote_normalize (lower case, punctuation and repeated spaces removed), so
+-- "Attention Is All You Need" and "Attention is all you need." normalize to the same string.
+-- GiST indexes serve both the % (similarity above threshold) filter and <-> (distance) ordering.
+--
+-- pg_trgm is a contrib extension that is not installed on every server. Without it only citenote_normalize is
+-- created and similarity lookups answer 503. After installing the extension, delete this migration from
+-- citenote_migrations and run migrate-db again.
+
+CREATE OR REPLACE FUNCTION citenote_normalize(value text)
+RETURNS text LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE AS $$
+    SELECT btrim(regexp_replace(lower(value), '[^[:alnum:]]+', ' ', 'g'))
+$$;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+        RAISE NOTICE 'pg_trgm extension is not available, trigram indexes are not created';
+        RETURN;
+    END IF;
+
+    CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+    CREATE INDEX IF NOT EXISTS ix_papers_name_trgm ON papers USING gist (citenote_normalize(name) gist_trgm_ops);
+
+    CREATE INDEX IF NOT EXISTS ix_citations_title_trgm
+        ON citations USING gist (citenote_normalize(title) gist_trgm_ops);
+EXCEPTION
+    WHEN insufficient_privilege THEN
+        RAISE NOTICE 'pg_trgm extension cannot be created by this user, trigram indexes are not created';
+END
+$$;
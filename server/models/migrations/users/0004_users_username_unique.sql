@@ -0,0 +1,16 @@
+-- Unique index on users.username, so lookups by username use the index instead of scanning users.
+-- Duplicate usernames can not be merged automatically, migration stops and lists them instead.
+
+DO $$
+DECLARE
+    duplicates text;
+BEGIN
+    SELECT string_agg(username, ', ') INTO duplicates
+        FROM (SELECT username FROM users GROUP BY username HAVING count(*) > 1) d;
+
+    IF duplicates IS NOT NULL THEN
+        RAISE EXCEPTION 'Resolve duplicate usernames before migrating: %', duplicates;
+    END IF;
+END $$;
+
+CREATE UNIQUE INDEX IF NOT EXISTS ix_users_username ON users (username);
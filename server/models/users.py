@@ -1,14 +1,12 @@
-from flask_sqlalchemy import SQLAlchemy
-
-
-db = SQLAlchemy()
+from .base import db
 
 
 class User(db.Model):  # type: ignore
     __tablename__ = "users"
+    __bind_key__ = "users"
 
     id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String)
+    username = db.Column(db.String, unique=True, index=True)
     password = db.Column(db.String)
     last_login = db.Column(db.DateTime)
     is_superuser = db.Column(db.Boolean)
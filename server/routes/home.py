@@ -1,6 +1,9 @@
-from flask import Blueprint
+from flask import Blueprint, Response
 
+from ..util.cache import cached
+from ..util.db import get_pool_status
 from ..util.helper.helper_main import get_config, get_version
+from ..util.metrics import CONTENT_TYPE, render_metrics
 
 
 _home = Blueprint("home", __name__)
@@ -13,6 +16,7 @@ def home_home():
 
 
 @_home.route("/about", methods=("GET",))
+@cached("about")
 def home_about():
     """Handles about home route"""
     return {
@@ -22,3 +26,17 @@ def home_about():
         "author": get_config("author"),
         "contact": get_config("author_email"),
     }, 200
+
+
+@_home.route("/status", methods=("GET",))
+def home_status():
+    """Handles status home route"""
+    return {
+        "pools": get_pool_status(),
+    }, 200
+
+
+@_home.route("/metrics", methods=("GET",))
+def home_metrics():
+    """Handles metrics home route"""
+    return Response(render_metrics(), content_type=CONTENT_TYPE)
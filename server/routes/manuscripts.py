@@ -1,5 +1,6 @@
 from flask import Blueprint, request
 
+from ..util.helper.helper_bibtex import get_manuscript_bibtex
 from ..util.helper.helper_manuscripts import (
     add_paper,
     delete,
@@ -40,7 +41,7 @@ def manuscript_basic():
             return {}, 500
 
 
-@_manuscripts.route("/<string:manuscript_id>/add_paper/", methods=("GET", "POST", "PATCH", "DELETE"))
+@_manuscripts.route("/<int:manuscript_id>/add_paper/", methods=("GET", "POST", "PATCH", "DELETE"))
 def manuscript_add_papers(manuscript_id):
     """Handles manuscript paper association routes"""
     match request.method:
@@ -52,3 +53,9 @@ def manuscript_add_papers(manuscript_id):
             return remove_paper(manuscript_id=manuscript_id)
         case _:
             return {}, 500
+
+
+@_manuscripts.route("/<int:manuscript_id>/bibtex", methods=("GET",))
+def manuscript_bibtex(manuscript_id):
+    """Handles manuscript bibliography export route"""
+    return get_manuscript_bibtex(manuscript_id=manuscript_id)
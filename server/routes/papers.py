@@ -1,9 +1,13 @@
 from flask import Blueprint, request
 
+from ..util.helper.helper_bibtex import post as post_bibtex
 from ..util.helper.helper_papers import (
     delete as delete_basic,
     get as get_basic,
     post as post_basic,
+    post_bulk,
+    search,
+    similar,
     update as update_basic,
 )
 from ..util.helper.helper_citations import (
@@ -43,6 +47,30 @@ def papers_basic():
             return {"message": "_ method"}, 405
 
 
+@_papers.route("/bulk", methods=("POST",))
+def papers_bulk():
+    """Handles papers bulk route"""
+    return post_bulk()
+
+
+@_papers.route("/search")
+def papers_search():
+    """Handles papers search route"""
+    return search()
+
+
+@_papers.route("/similar")
+def papers_similar():
+    """Handles papers similar route"""
+    return similar()
+
+
+@_papers.route("/bibtex", methods=("POST",))
+def papers_bibtex():
+    """Handles papers bibtex import route"""
+    return post_bibtex()
+
+
 @_papers.route("/paper/<string:paper_id>", methods=("GET", "POST", "PATCH", "PUT", "DELETE"))
 def papers_advance(paper_id):
     """Handles papers advance routes"""
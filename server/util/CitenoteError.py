@@ -1,4 +1,7 @@
-from .helper.helper_main import bcolors
+from .logger import get_logger
+
+
+log = get_logger("errors")
 
 
 class CitenoteException(BaseException):
@@ -16,11 +19,8 @@ class CitenoteException(BaseException):
         return repr(self)
 
     def print_error(self):
-        """Prints out warning message with help of bcolors class"""
-        bcolors.print_warning(
-            self.message,
-            self.error + "()",
-        )
+        """Logs warning message through diagnostic logger"""
+        log.warning("%s - Error: %s()", self.message, self.error)
 
 
 class SameValueError(CitenoteException):
@@ -51,6 +51,13 @@ class RoleError(CitenoteException):
         super().__init__("RoleError", "Invalid user role")
 
 
+class UsernameFoundError(CitenoteException):
+    """Username already exists"""
+
+    def __init__(self):
+        super().__init__("UsernameFoundError", "Username already exists")
+
+
 class UsernameNotInSession(CitenoteException):
     """Username not present in session"""
 
@@ -93,5 +100,36 @@ class ManuscriptNotFoundError(CitenoteException):
         super().__init__("ManuscriptNotFoundError", "Manuscript not found in database.")
 
 
+class HashingBusyError(CitenoteException):
+    """All password hashing slots are busy
+
+    Attributes:
+        retry_after (float): Seconds after which the caller may try again.
+
+    """
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__("HashingBusyError", "Password hashing is busy, try again later")
+        self.retry_after = retry_after
+
+
+class CitationError(CitenoteException):
+    """Citation does not match schema of its type"""
+
+
+class UnknownCitationTypeError(CitationError):
+    """Citation type is not defined in papers.yaml"""
+
+    def __init__(self, citation_type: str) -> None:
+        super().__init__("UnknownCitationTypeError", f"Unknown citation type: {citation_type}")
+
+
+class MissingFieldsError(CitationError):
+    """Required citation fields are missing"""
+
+    def __init__(self, citation_type: str, fields: list[str]) -> None:
+        super().__init__("MissingFieldsError", f"Missing required fields for {citation_type}: {', '.join(fields)}")
+
+
 if __name__ == "__main__":
     raise SystemExit
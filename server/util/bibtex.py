@@ -0,0 +1,357 @@
+"""./server/util/bibtex
+
+Streaming BibTeX parser and writer.
+
+Entries are parsed from a text stream read in chunks. Only the current entry and one chunk are held in memory, so
+bibliographies of any size are parsed in constant memory.
+
+An entry that is not closed before the next entry starting on its own line, before the end of the stream or within
+MAX_ENTRY_SIZE characters is reported as unterminated, and parsing continues with the next entry starting on its own
+line.
+"""
+
+import re
+from typing import Callable, Iterable, Iterator, NamedTuple, TextIO
+
+
+CHUNK_SIZE = 1 << 16
+MAX_ENTRY_SIZE = 1 << 20
+
+MONTHS = {
+    "jan": "January",
+    "feb": "February",
+    "mar": "March",
+    "apr": "April",
+    "may": "May",
+    "jun": "June",
+    "jul": "July",
+    "aug": "August",
+    "sep": "September",
+    "oct": "October",
+    "nov": "November",
+    "dec": "December",
+}
+
+ENTRY_START = re.compile(r"@\s*([A-Za-z]+)\s*([{(])")
+BRACE_END = re.compile(r"[{}]")
+ENTRY_BRACE_END = re.compile(r'[{}"]|\n[ \t]*@')
+ENTRY_PAREN_END = re.compile(r'[{})"]|\n[ \t]*@')
+LINE_START_ENTRY = re.compile(r"\n[ \t]*@")
+FIELD_NAME = re.compile(r"\s*([A-Za-z0-9_\-:.+/]+)\s*=\s*")
+WORD = re.compile(r"[^\s,#{}\"]+")
+SEPARATORS = re.compile(r"[\s,]*")
+
+
+class BibtexEntry(NamedTuple):
+    """Parsed BibTeX entry
+
+    Attributes:
+        type (str): Lower case entry type, e.g. "article".
+        key (str): Citation key.
+        fields (dict): Lower case field names mapped to their values.
+
+    """
+
+    type: str
+    key: str
+    fields: dict
+
+
+def match_brace(text: str, pos: int) -> int:
+    """Returns index of brace closing the brace at pos
+
+    Raises:
+        ValueError: If brace is not closed.
+
+    """
+
+    depth = 0
+    for match in BRACE_END.finditer(text, pos):
+        if match.group() == "{":
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return match.start()
+
+    raise ValueError("Unbalanced braces")
+
+
+def match_quote(text: str, pos: int) -> int:
+    """Returns index of quote closing the quote at pos, ignoring quotes inside braces
+
+    Raises:
+        ValueError: If quote is not closed.
+
+    """
+
+    depth = 0
+    for index in range(pos + 1, len(text)):
+        char = text[index]
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+        elif char == '"' and depth == 0:
+            return index
+
+    raise ValueError("Unterminated quoted value")
+
+
+class BibtexParser:
+    """Incremental BibTeX parser
+
+    Iterating the parser yields BibtexEntry objects. @comment and @preamble entries are skipped, @string entries
+    define macros used by later entries.
+
+    Attributes:
+        stream (TextIO): Stream of BibTeX text.
+        chunk_size (int): Number of characters read at once.
+        on_error (Callable): Called with message for every skipped malformed entry.
+        max_entry_size (int): Number of characters after which an entry that is not closed is skipped.
+        macros (dict): Defined @string macros.
+
+    """
+
+    def __init__(
+        self,
+        stream: TextIO,
+        chunk_size: int = CHUNK_SIZE,
+        on_error: Callable[[str], None] | None = None,
+        max_entry_size: int = MAX_ENTRY_SIZE,
+    ) -> None:
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.on_error = on_error
+        self.max_entry_size = max_entry_size
+        self.macros = dict(MONTHS)
+
+    def __iter__(self) -> Iterator[BibtexEntry]:
+        buffer = ""
+        pos = 0
+        eof = False
+
+        while True:
+            match = ENTRY_START.search(buffer, pos)
+            end = self.find_end(buffer, match.end(), match.group(2)) if match else None
+
+            if end is None and not eof and (match is None or len(buffer) - match.start() <= self.max_entry_size):
+                if match:
+                    buffer = buffer[match.start():]
+                else:
+                    # Keep possible start of an entry split between two chunks
+                    keep = buffer.rfind("@", max(pos, len(buffer) - 64))
+                    buffer = buffer[keep:] if keep != -1 else ""
+
+                pos = 0
+                chunk = self.stream.read(self.chunk_size)
+                if chunk:
+                    buffer += chunk
+                else:
+                    eof = True
+                continue
+
+            if match is None:
+                return
+
+            if end is None or buffer[end] == "@":
+                self.error(f"Unterminated entry at {buffer[match.start():match.start() + 40]!r}")
+                # Resume at next entry starting on its own line, or read on if buffer has none
+                resync = LINE_START_ENTRY.search(buffer, match.end())
+                pos = resync.end() - 1 if resync else len(buffer)
+                continue
+
+            pos = end + 1
+            entry_type = match.group(1).lower()
+            body = buffer[match.end():end]
+
+            try:
+                entry = self.parse_entry(entry_type, body)
+            except ValueError as err:
+                self.error(f"{err} in entry {body[:40].strip()!r}")
+                continue
+
+            if entry is not None:
+                yield entry
+
+    def error(self, message: str) -> None:
+        if self.on_error is not None:
+            self.on_error(message)
+
+    @staticmethod
+    def find_end(buffer: str, start: int, opener: str) -> int | None:
+        """Returns end of entry whose body starts at start
+
+        Quotes are tracked outside braces, so ")" inside a quoted value does not close an entry opened with "(". An
+        entry starting on its own line outside braces cannot be part of the body, the entry is unterminated then.
+
+        Returns:
+            (int | None): Index of character closing the entry, index of "@" of the next entry if entry is
+                unterminated, or None if entry is not complete in buffer.
+
+        """
+
+        depth = 0
+        quoted = False
+        pattern = ENTRY_BRACE_END if opener == "{" else ENTRY_PAREN_END
+        for match in pattern.finditer(buffer, start):
+            char = match.group()
+            if char == "{":
+                depth += 1
+            elif char == "}":
+                if depth == 0:
+                    return match.start()
+                depth -= 1
+            elif depth > 0:
+                continue
+            elif char == '"':
+                quoted = not quoted
+            elif char == ")":
+                if not quoted:
+                    return match.start()
+            else:
+                return match.end() - 1
+
+        return None
+
+    def parse_entry(self, entry_type: str, body: str) -> BibtexEntry | None:
+        """Parses body of entry
+
+        Returns:
+            (BibtexEntry | None): Entry or None for @comment, @preamble and @string.
+
+        Raises:
+            ValueError: If entry is malformed.
+
+        """
+
+        if entry_type in ("comment", "preamble"):
+            return None
+
+        if entry_type == "string":
+            for name, value in self.parse_fields(body, 0).items():
+                self.macros[name] = value
+            return None
+
+        comma = body.find(",")
+        if comma == -1:
+            key, fields = body.strip(), {}
+        else:
+            key, fields = body[:comma].strip(), self.parse_fields(body, comma + 1)
+
+        if not key:
+            raise ValueError("Missing citation key")
+
+        return BibtexEntry(entry_type, key, fields)
+
+    def parse_fields(self, text: str, pos: int) -> dict:
+        """Parses comma separated "name = value" pairs"""
+
+        fields = {}
+        while True:
+            pos = SEPARATORS.match(text, pos).end()  # type: ignore[union-attr]
+            if pos >= len(text):
+                return fields
+
+            match = FIELD_NAME.match(text, pos)
+            if not match:
+                raise ValueError(f"Invalid field {text[pos:pos + 20]!r}")
+
+            value, pos = self.parse_value(text, match.end())
+            fields[match.group(1).lower()] = value
+
+    def parse_value(self, text: str, pos: int) -> tuple[str, int]:
+        """Parses value with "#" concatenation
+
+        Returns:
+            (tuple): Value with whitespace collapsed and position after the value.
+
+        """
+
+        parts = []
+        while True:
+            while pos < len(text) and text[pos].isspace():
+                pos += 1
+
+            char = text[pos] if pos < len(text) else ""
+            if char == "{":
+                end = match_brace(text, pos)
+                parts.append(text[pos + 1:end])
+                pos = end + 1
+            elif char == '"':
+                end = match_quote(text, pos)
+                parts.append(text[pos + 1:end])
+                pos = end + 1
+            else:
+                match = WORD.match(text, pos)
+                if not match:
+                    raise ValueError(f"Missing value at {text[pos:pos + 20]!r}")
+                word = match.group()
+                parts.append(word if word.isdigit() else self.macros.get(word.lower(), word))
+                pos = match.end()
+
+            while pos < len(text) and text[pos].isspace():
+                pos += 1
+
+            if pos < len(text) and text[pos] == "#":
+                pos += 1
+                continue
+
+            return " ".join("".join(parts).split()), pos
+
+
+def iter_entries(
+    stream: TextIO,
+    chunk_size: int = CHUNK_SIZE,
+    on_error: Callable[[str], None] | None = None,
+) -> Iterator[BibtexEntry]:
+    """Yields entries of BibTeX stream
+
+    Args:
+        stream (TextIO): Stream of BibTeX text.
+        chunk_size (int): Number of characters read at once.
+        on_error (Callable): Called with message for every skipped malformed entry.
+
+    """
+
+    return iter(BibtexParser(stream, chunk_size, on_error))
+
+
+def is_balanced(value: str) -> bool:
+    """Returns True if braces of value are balanced"""
+
+    depth = 0
+    for match in BRACE_END.finditer(value):
+        depth += 1 if match.group() == "{" else -1
+        if depth < 0:
+            return False
+
+    return depth == 0
+
+
+def format_entry(entry_type: str, key: str, fields: Iterable[tuple[str, str | None]]) -> str:
+    """Formats BibTeX entry
+
+    Values are wrapped in braces. Empty values are omitted and values with unbalanced braces lose their braces, so
+    the output can always be parsed back.
+
+    Args:
+        entry_type (str): Entry type, e.g. "article".
+        key (str): Citation key.
+        fields (Iterable): Field names and values in output order.
+
+    Returns:
+        (str): Entry followed by blank line.
+
+    """
+
+    lines = [f"@{entry_type}{{{key},"]
+    for name, value in fields:
+        if not value:
+            continue
+        if not is_balanced(value):
+            value = value.replace("{", "").replace("}", "")
+        lines.append(f"  {name} = {{{value}}},")
+
+    lines.append("}\n\n")
+    return "\n".join(lines)
@@ -0,0 +1,268 @@
+"""./server/util/cache
+
+Response cache for read routes.
+
+Successful GET responses are stored per process, keyed by path, query and form data, and served with a strong ETag.
+Clients revalidating with ``If-None-Match`` get ``304 Not Modified`` without the route touching the database.
+
+Entries are fresh for ``cache_ttl`` seconds. For further ``cache_stale_ttl`` seconds a stale entry is still served
+while one background thread recomputes it. Every entry has tags, e.g. "papers"; helpers that write data invalidate
+their tags, which makes all entries computed before the write unusable in the same process. Both settings are read
+from config.json. The cache is off until ``cache_ttl`` is set above 0.
+
+Entries and tag generations live in the memory of each process. With several worker processes (e.g. gunicorn or
+uvicorn --workers) a write invalidates only the worker that handled it, other workers keep serving their entries for
+up to ``cache_ttl`` + ``cache_stale_ttl`` seconds. Enable the cache only for single process deployments, or with
+lifetimes short enough that such stale reads are acceptable.
+"""
+
+import collections
+import functools
+import hashlib
+import threading
+import time
+from typing import Callable, NamedTuple
+
+from flask import Response, copy_current_request_context, make_response, request
+
+from .logger import get_logger
+from .registry import registry
+
+
+log = get_logger("cache")
+
+DEFAULT_TTL = 0.0
+DEFAULT_STALE_TTL = 300.0
+DEFAULT_MAX_ENTRIES = 1024
+
+
+class CacheEntry(NamedTuple):
+    """Stored response
+
+    Attributes:
+        body (bytes): Response body.
+        mimetype (str): Mimetype of the body.
+        etag (str): Hash of the body.
+        created (float): Monotonic time the response was computed at.
+        generations (tuple): Generations of the tags when computation started.
+
+    """
+
+    body: bytes
+    mimetype: str
+    etag: str
+    created: float
+    generations: tuple
+
+
+class ResponseCache:
+    """In-process cache of GET responses with tag based invalidation
+
+    Invalidation does not reach other processes, see module docstring.
+
+    Attributes:
+        max_entries (int): Entries kept, least recently used are dropped first.
+        stats (Counter): Number of hits, stale hits, misses, not modified responses, refreshes and invalidations.
+
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self.stats: collections.Counter = collections.Counter()
+        self._entries: collections.OrderedDict[tuple, CacheEntry] = collections.OrderedDict()
+        self._generations: collections.Counter = collections.Counter()
+        self._refreshing: set[tuple] = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def get_settings() -> tuple[float, float]:
+        """Returns fresh and stale lifetime in seconds from config.json"""
+
+        config = registry.get("config")
+        return (
+            float(config.get("cache_ttl", DEFAULT_TTL)),
+            float(config.get("cache_stale_ttl", DEFAULT_STALE_TTL)),
+        )
+
+    @staticmethod
+    def get_key() -> tuple:
+        return (
+            request.path,
+            tuple(sorted(request.args.items(multi=True))),
+            tuple(sorted(request.form.items(multi=True))),
+        )
+
+    def invalidate(self, *tags: str) -> None:
+        """Makes every entry with one of the tags unusable in this process"""
+
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] += 1
+            self.stats["invalidations"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def lookup(self, key: tuple, tags: tuple) -> CacheEntry | None:
+        """Returns entry if it is still valid for tags"""
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            if entry.generations != tuple(self._generations[tag] for tag in tags):
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return entry
+
+    def store(self, key: tuple, response: Response, generations: tuple, created: float) -> CacheEntry | None:
+        """Stores successful response, returns None for other responses"""
+
+        if response.status_code != 200 or response.is_streamed:
+            return None
+
+        body = response.get_data()
+        entry = CacheEntry(body, response.mimetype, hashlib.sha256(body).hexdigest()[:32], created, generations)
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return entry
+
+    def compute(self, key: tuple, tags: tuple, view: Callable, *args, **kwargs) -> tuple[Response, CacheEntry | None]:
+        """Runs view and stores its response"""
+
+        with self._lock:
+            generations = tuple(self._generations[tag] for tag in tags)
+
+        created = time.monotonic()
+        response = make_response(view(*args, **kwargs))
+        return response, self.store(key, response, generations, created)
+
+    def refresh(self, key: tuple, tags: tuple, view: Callable, *args, **kwargs) -> None:
+        """Recomputes stale entry in background thread, at most one refresh per key runs at once"""
+
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        @copy_current_request_context
+        def run():
+            try:
+                self.compute(key, tags, view, *args, **kwargs)
+                self.stats["refreshes"] += 1
+            except Exception as err:
+                log.warning("Refresh of %s failed - Error: %r", key[0], err)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, name="citenote-cache-refresh", daemon=True).start()
+
+    @staticmethod
+    def respond(entry: CacheEntry, state: str) -> Response:
+        """Builds response from entry, 304 if client already has it"""
+
+        if request.if_none_match.contains(entry.etag):
+            response = Response(status=304)
+        else:
+            response = Response(entry.body, mimetype=entry.mimetype)
+
+        response.set_etag(entry.etag)
+        response.headers["Cache-Control"] = "no-cache"
+        response.headers["Age"] = str(int(time.monotonic() - entry.created))
+        response.headers["X-Cache"] = state
+        return response
+
+    def cached(self, *tags: str) -> Callable:
+        """Caches GET responses of route or route helper
+
+        Args:
+            *tags (str): Tags invalidating the responses.
+
+        Returns:
+            decorator (Callable): Decorator for the function.
+
+        """
+
+        def decorator(func: Callable) -> Callable:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                ttl, stale_ttl = self.get_settings()
+                if request.method not in ("GET", "HEAD") or ttl <= 0:
+                    return func(*args, **kwargs)
+
+                key = self.get_key()
+                entry = self.lookup(key, tags)
+                if entry is not None:
+                    age = time.monotonic() - entry.created
+                    if age < ttl:
+                        state = "HIT"
+                    elif age < ttl + stale_ttl:
+                        state = "STALE"
+                        self.refresh(key, tags, func, *args, **kwargs)
+                    else:
+                        entry = None
+
+                if entry is None:
+                    state = "MISS"
+                    response, entry = self.compute(key, tags, func, *args, **kwargs)
+                    if entry is None:
+                        self.stats["uncacheable"] += 1
+                        return response
+
+                self.stats[state.lower()] += 1
+                response = self.respond(entry, state)
+                if response.status_code == 304:
+                    self.stats["not_modified"] += 1
+                return response
+
+            return wrapper
+
+        return decorator
+
+    def invalidates(self, *tags: str) -> Callable:
+        """Invalidates tags after function returns or raises
+
+        Args:
+            *tags (str): Tags of responses affected by the function.
+
+        Returns:
+            decorator (Callable): Decorator for the function.
+
+        """
+
+        def decorator(func: Callable) -> Callable:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.invalidate(*tags)
+
+            return wrapper
+
+        return decorator
+
+
+response_cache = ResponseCache()
+cached = response_cache.cached
+invalidates = response_cache.invalidates
+invalidate = response_cache.invalidate
+
+
+def invalidate_config(*_) -> None:
+    """Invalidates responses built from configuration files, registered as registry listener"""
+
+    invalidate("about")
@@ -1,25 +1,59 @@
-import json
+"""./server/util/database
 
-import psycopg2
-from flask import g
+Raw DBAPI connections for code that needs the driver directly, e.g. COPY or executemany in bulk operations.
+
+Connections are borrowed from the pool of the ORM engine, so no new connection is opened per request and the
+application keeps a single pool per database.
+"""
 
+import contextlib
+from typing import Iterator
+
+from flask import g
 
-with open("config.json") as config_file:
-    postgres = json.load(config_file)
+from ..models.base import db
 
 
 def get_db():
+    """Returns raw connection of current request context
+
+    The connection is borrowed from the engine pool on first call and returned by close_db.
+    """
+
     if "db" not in g:
-        g.db = psycopg2.connect(
-            user=postgres["pg_user"],
-            password=postgres["pg_password"],
-            host=postgres["pg_host"],
-            port=postgres["pg_port"],
-            database=postgres["pg_database"],
-        )
+        g.db = db.engine.raw_connection()
     return g.db
 
 
-def close_db():
-    if g.db:
-        g.db.close()
+def close_db(*_):
+    """Returns connection of current request context to the pool"""
+
+    connection = g.pop("db", None)
+    if connection is not None:
+        connection.close()
+
+
+@contextlib.contextmanager
+def borrow_connection(bind_key: str | None = None) -> Iterator:
+    """Borrows raw connection from the engine pool
+
+    Transaction is committed when the block exits normally and rolled back otherwise. Connection is returned to the
+    pool in both cases.
+
+    Args:
+        bind_key (str): Name of the bind (default=None for main engine)
+
+    Yields:
+        connection: DBAPI connection proxy (psycopg2 connection)
+
+    """
+
+    connection = db.engines[bind_key].raw_connection()
+    try:
+        yield connection
+        connection.commit()
+    except BaseException:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
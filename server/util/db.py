@@ -1,12 +1,29 @@
-import json
+from typing import Mapping
 
-from ..models.data_models import db as dtm_db
-from ..models.users import db as user_db
+from ..models.base import db
+from .registry import registry
 
 
-def get_uri():
-    with open("config.json", "r") as config_file:
-        config = json.load(config_file)
+# Pool settings read from config.json and the type they are converted to
+POOL_OPTIONS = {
+    "pool_size": int,
+    "max_overflow": int,
+    "pool_recycle": int,
+    "pool_timeout": float,
+    "pool_pre_ping": bool,
+}
+
+
+def get_uri(config: Mapping | None = None):
+    """Returns database uri
+
+    Args:
+        config (Mapping): Mapping with pg_* fields (default=config.json)
+
+    """
+
+    if config is None:
+        config = registry.get("config")
 
     user = config["pg_user"]
     password = config["pg_password"]
@@ -17,9 +34,70 @@ def get_uri():
     return f"postgresql://{user}:{password}@{host}:{port}/{database}"
 
 
+def get_engine_options() -> dict:
+    """Returns connection pool options provided in config.json
+
+    Returns:
+        options (dict): Keyword arguments for create_engine.
+
+    """
+
+    config = registry.get("config")
+    return {name: cast(config[name]) for name, cast in POOL_OPTIONS.items() if name in config}
+
+
 def init_dbs(_app):
-    user_db.init_app(_app)
-    dtm_db.init_app(_app)
+    """Binds database to the flask app
+
+    All models share one engine. When config.json has a "users_database" mapping with its own pg_* fields, users are
+    stored in that database through the "users" bind instead.
+
+    Args:
+        _app (Flask): Flask application
+
+    """
+
+    users_config = registry.get("config").get("users_database")
+
+    _app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", get_engine_options())
+    if users_config:
+        _app.config.setdefault("SQLALCHEMY_BINDS", {})["users"] = get_uri(users_config)
+
+    db.init_app(_app)
+
+    if not users_config:
+        with _app.app_context():
+            # "users" bind reuses the default engine instead of opening a second pool
+            db.engines["users"] = db.engine
+
+
+def get_pool_status() -> dict:
+    """Returns statistics of connection pools
+
+    Must be called inside application context.
+
+    Returns:
+        (dict): Statistics for every distinct engine, keyed by bind name ("default" for main engine).
+
+    """
+
+    status = {}
+    seen = set()
+    for key, engine in db.engines.items():
+        if id(engine) in seen:
+            continue
+        seen.add(id(engine))
+
+        pool = engine.pool
+        status[key or "default"] = {
+            "class": type(pool).__name__,
+            "size": getattr(pool, "size", lambda: None)(),
+            "checked_in": getattr(pool, "checkedin", lambda: None)(),
+            "checked_out": getattr(pool, "checkedout", lambda: None)(),
+            "overflow": getattr(pool, "overflow", lambda: None)(),
+        }
+
+    return status
 
 
 if __name__ == "__main__":
@@ -0,0 +1,146 @@
+"""./server/util/hashing
+
+Bounded worker pool for password hashing.
+
+Password hashing is deliberately CPU heavy. Hashes are computed by a fixed number of worker threads (hashlib releases
+the GIL while hashing), so a burst of logins uses at most ``hash_workers`` cores and other requests keep running.
+Callers wait at most ``hash_queue_timeout`` seconds for a free slot before HashingBusyError is raised, routes answer
+it with 503 and Retry-After.
+
+When pool settings change, a new pool replaces the old one. The old pool is not shut down: callers that already took
+it finish their jobs there, and its worker threads exit once the last of them drops it. Stored hashes made with
+another method or salt length are rehashed on next login.
+
+Settings are read from config.json:
+    hash_method (str): werkzeug hash method (default="pbkdf2:sha256:260000")
+    hash_salt_length (int): Salt length (default=16)
+    hash_workers (int): Concurrent hashes (default=half of the cpu cores, at least 1)
+    hash_queue_size (int): Callers waiting for a worker (default=4 per worker)
+    hash_queue_timeout (float): Seconds a caller waits for a slot (default=5.0)
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+from .CitenoteError import HashingBusyError
+from .registry import registry
+
+
+DEFAULT_METHOD = "pbkdf2:sha256:260000"
+DEFAULT_SALT_LENGTH = 16
+DEFAULT_WORKERS = max((os.cpu_count() or 2) // 2, 1)
+DEFAULT_QUEUE_PER_WORKER = 4
+DEFAULT_QUEUE_TIMEOUT = 5.0
+
+
+class HashPool:
+    """Executor with bounded queue for hashing jobs
+
+    Attributes:
+        workers (int): Number of worker threads.
+        queue_size (int): Number of jobs allowed to wait for a worker.
+        timeout (float): Seconds a caller waits for a free slot.
+
+    """
+
+    def __init__(self, workers: int, queue_size: int, timeout: float) -> None:
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="citenote-hash")
+
+    def run(self, func: Callable, *args):
+        """Runs func in worker thread and returns its result
+
+        Raises:
+            HashingBusyError: If no slot gets free within timeout.
+
+        """
+
+        if not self._slots.acquire(timeout=self.timeout):
+            raise HashingBusyError(self.timeout)
+
+        try:
+            return self._executor.submit(func, *args).result()
+        finally:
+            self._slots.release()
+
+
+_pool: HashPool | None = None
+_pool_lock = threading.Lock()
+
+
+def normalize_method(method: str) -> str:
+    """Adds default iterations to pbkdf2 method, as they are part of stored hashes"""
+
+    if method.startswith("pbkdf2:") and method.count(":") == 1:
+        return f"{method}:{DEFAULT_PBKDF2_ITERATIONS}"
+
+    return method
+
+
+def get_settings() -> dict:
+    """Returns hashing settings from config.json"""
+
+    config = registry.get("config")
+    workers = int(config.get("hash_workers", DEFAULT_WORKERS))
+    return {
+        "method": normalize_method(config.get("hash_method", DEFAULT_METHOD)),
+        "salt_length": int(config.get("hash_salt_length", DEFAULT_SALT_LENGTH)),
+        "workers": workers,
+        "queue_size": int(config.get("hash_queue_size", workers * DEFAULT_QUEUE_PER_WORKER)),
+        "timeout": float(config.get("hash_queue_timeout", DEFAULT_QUEUE_TIMEOUT)),
+    }
+
+
+def get_pool() -> HashPool:
+    """Returns hashing pool, pool is replaced when its settings change
+
+    Replaced pool is left to drain, ThreadPoolExecutor stops workers of an executor that is no longer referenced.
+    """
+
+    global _pool
+
+    settings = get_settings()
+    pool = _pool
+    if pool is None or (pool.workers, pool.queue_size, pool.timeout) != (
+        settings["workers"],
+        settings["queue_size"],
+        settings["timeout"],
+    ):
+        with _pool_lock:
+            if _pool is pool:
+                _pool = HashPool(settings["workers"], settings["queue_size"], settings["timeout"])
+            pool = _pool
+
+    return pool  # type: ignore[return-value]
+
+
+def gen_hash(password: str) -> str:
+    """Hashes password with configured method in hashing pool"""
+
+    settings = get_settings()
+    return get_pool().run(generate_password_hash, password, settings["method"], settings["salt_length"])
+
+
+def check_hash(password: str, hash: str) -> bool:
+    """Checks password against hash in hashing pool"""
+
+    return get_pool().run(check_password_hash, hash, password)
+
+
+def needs_rehash(hash: str) -> bool:
+    """Returns True if hash was made with other method or salt length than the configured ones
+
+    Hashes are stored as "method$salt$hash".
+    """
+
+    method, _, rest = hash.partition("$")
+    salt = rest.partition("$")[0]
+    settings = get_settings()
+    return method != settings["method"] or len(salt) != settings["salt_length"]
@@ -1,15 +1,22 @@
+from .helper_bibtex import export_bibtex_file, import_bibtex_file
 from .helper_main import (
     citenote_check_hash,
     citenote_gen_hash,
+    citenote_needs_rehash,
     connect_db,
     create_admin,
     init_db,
+    migrate_db,
 )
 
 __all__ = (
     "citenote_check_hash",
     "citenote_gen_hash",
+    "citenote_needs_rehash",
     "connect_db",
     "init_db",
     "create_admin",
+    "migrate_db",
+    "import_bibtex_file",
+    "export_bibtex_file",
 )
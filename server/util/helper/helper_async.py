@@ -0,0 +1,198 @@
+"""helper_async.py
+
+Async read helpers for the ASGI entry point (server/asgi.py).
+
+Statements are shared with the sync helpers, only execution differs: they run on an async engine with asyncpg, so a
+request waiting for the database does not hold a thread. Sync helpers stay in use for the flask application.
+"""
+
+import functools
+from typing import Awaitable, Callable, Mapping
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from werkzeug.exceptions import HTTPException, NotFound
+
+from ...models.data_models import Manuscript, manuscript_paper
+from ..CitenoteError import CitenoteException, ManuscriptNotFoundError
+from ..db import get_engine_options, get_uri
+from ..logger import get_logger
+from .helper_manuscripts import get_manuscripts_page, get_papers_page
+from .helper_models import row_formatter
+from .helper_pagination import get_count_statement, get_total_statement
+from .helper_papers import format_search_row, get_search_page
+
+
+log = get_logger("async")
+
+ASYNC_DRIVER = "postgresql+asyncpg"
+
+_engine: AsyncEngine | None = None
+_sessionmaker: async_sessionmaker | None = None
+
+
+def get_async_engine() -> AsyncEngine:
+    """Returns async engine, created on first call with pool options of config.json
+
+    Engine must be used from one event loop only.
+    """
+
+    global _engine, _sessionmaker
+
+    if _engine is None:
+        uri = get_uri().replace("postgresql", ASYNC_DRIVER, 1)
+        _engine = create_async_engine(uri, **get_engine_options())
+        _sessionmaker = async_sessionmaker(_engine, expire_on_commit=False)
+
+    return _engine
+
+
+def get_async_session() -> AsyncSession:
+    """Returns new session of async engine"""
+
+    get_async_engine()
+    return _sessionmaker()  # type: ignore[misc]
+
+
+async def dispose_async_engine() -> None:
+    """Closes connections of async engine"""
+
+    global _engine, _sessionmaker
+
+    if _engine is not None:
+        await _engine.dispose()
+        _engine = _sessionmaker = None
+
+
+async def get_total(session: AsyncSession, statement, table_name: str | None, args: Mapping) -> int | None:
+    """Async counterpart of helper_pagination.get_total"""
+
+    total = get_total_statement(statement, table_name, args)
+    if total is None:
+        return None
+
+    value = await session.scalar(total)
+    if value is None or value < 0:
+        value = await session.scalar(get_count_statement(statement))
+
+    return int(value)
+
+
+def async_model_handler(func: Callable[..., Awaitable]) -> Callable[..., Awaitable]:
+    """Handles error for async route helpers, same as model_handler
+
+    HTTP errors raised by the function (e.g. abort(400) for invalid paging queries) are passed on to the caller, which
+    answers them with the json error handler of the flask application. Same input gets same status on both paths.
+
+    Args:
+        func (Callable): Coroutine function to run inside the wrapper
+
+    Returns:
+        wrapper (Callable): Wrapper for the function
+
+    """
+
+    @functools.wraps(func)
+    async def wrapper(**kwargs) -> tuple[dict, int]:
+        operation_name = func.__name__.upper()
+        try:
+            response = await func(**kwargs)
+
+            if response:
+                return response
+            return {}, 200
+
+        except HTTPException:
+            raise
+
+        except CitenoteException as err:
+            err.print_error()
+            return {}, 500
+
+        except ValueError as err:
+            log.warning("Wrong input type - Error: %r", err)
+            return {}, 500
+
+        except Exception as err:
+            log.error("'%s' operation failed - Error: %r", operation_name, err)
+            return {}, 500
+
+    return wrapper
+
+
+@async_model_handler
+async def get_manuscripts(args: Mapping):
+    """Async counterpart of helper_manuscripts.get for page of manuscripts
+
+    Raises:
+        ManuscriptNotFoundError: Raises if there are no manuscripts.
+
+    """
+
+    page = get_manuscripts_page(args)
+    async with get_async_session() as session:
+        manuscripts = (await session.execute(page.statement)).all()
+        if not manuscripts and not page.after:
+            raise ManuscriptNotFoundError
+
+        manuscripts, cursor = page.split(manuscripts)
+        val = {
+            "count": len(manuscripts),
+            "results": [row_formatter(manuscript) for manuscript in manuscripts],
+            "next": cursor,
+        }
+
+        total = await get_total(session, select(Manuscript), Manuscript.__tablename__, args)
+        if total is not None:
+            val["total"] = total
+
+    return val, 200
+
+
+@async_model_handler
+async def get_papers(manuscript_id: int, args: Mapping):
+    """Async counterpart of helper_manuscripts.get_paper
+
+    Raises:
+        NotFound: Raises if manuscript is not present in database.
+
+    """
+
+    async with get_async_session() as session:
+        if await session.get(Manuscript, manuscript_id) is None:
+            raise NotFound(description="Manuscript not found in database.")
+
+        page = get_papers_page(manuscript_id, args)
+        papers, cursor = page.split((await session.execute(page.statement)).all())
+        val = {
+            "count": len(papers),
+            "results": [row_formatter(paper) for paper in papers],
+            "next": cursor,
+        }
+
+        statement = select(manuscript_paper).where(manuscript_paper.c.manuscript_id == manuscript_id)
+        total = await get_total(session, statement, None, args)
+        if total is not None:
+            val["total"] = total
+
+    return val, 200
+
+
+@async_model_handler
+async def search_papers(args: Mapping):
+    """Async counterpart of helper_papers.search
+
+    Raises:
+        BadRequest: If query is missing, or limit or cursor is invalid.
+
+    """
+
+    page = get_search_page(args)
+    async with get_async_session() as session:
+        rows, cursor = page.split((await session.execute(page.statement)).all())
+
+    return {
+        "count": len(rows),
+        "results": [format_search_row(row) for row in rows],
+        "next": cursor,
+    }, 200
@@ -0,0 +1,293 @@
+import io
+from typing import Iterable, Iterator, Mapping, TextIO
+
+import click
+from flask import Response, request, stream_with_context
+from flask.cli import with_appcontext
+from sqlalchemy import insert, select
+
+from ...models.data_models import Citation, Manuscript, db, manuscript_paper
+from ..bibtex import BibtexEntry, format_entry, iter_entries
+from ..cache import invalidates
+from ..CitenoteError import CitationError, UnknownCitationTypeError
+from ..logger import bcolors, get_logger
+from ..schemas import CITATION_COLUMNS, CitationSchema, get_schemas
+from .helper_models import model_handler
+from .helper_papers import insert_papers
+
+
+log = get_logger("citations")
+
+IMPORT_BATCH_SIZE = 1000
+EXPORT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 100
+
+# Citation columns written as entry fields
+EXPORT_FIELDS = ("author", "title", *sorted(set(CITATION_COLUMNS) - {"type", "citation_key", "title", "author"}))
+
+
+def validate_entry(entry: BibtexEntry, schemas: Mapping[str, CitationSchema]) -> tuple[dict, dict]:
+    """Validates entry against its citation type
+
+    Args:
+        entry (BibtexEntry): Parsed entry.
+        schemas (Mapping): Compiled citation schemas.
+
+    Returns:
+        (tuple): Paper row and citation row of entry.
+
+    Raises:
+        UnknownCitationTypeError: If type is not defined in papers.yaml.
+        MissingFieldsError: If required fields are missing.
+
+    """
+
+    schema = schemas.get(entry.type)
+    if schema is None:
+        raise UnknownCitationTypeError(entry.type)
+
+    title = entry.fields.get("title") or entry.key
+    paper = {"name": title, "abstract": entry.fields.get("abstract")}
+
+    citation = dict.fromkeys(CITATION_COLUMNS)
+    citation.update(schema.validate(entry.fields))
+    citation.update(type=entry.type, citation_key=entry.key, title=title)
+
+    return paper, citation
+
+
+def write_batch(batch: list[tuple[dict, dict]]) -> int:
+    """Writes papers and their citations of one batch and commits
+
+    Papers whose name is already in database (or earlier in batch) are skipped along with their citation.
+
+    Args:
+        batch (list): Paper and citation rows from validate_entry.
+
+    Returns:
+        (int): Number of created papers.
+
+    """
+
+    rows = {}
+    for paper, citation in batch:
+        rows.setdefault(paper["name"], (paper, citation))
+
+    ids = insert_papers([paper for paper, _ in rows.values()])
+    citations = [dict(citation, paper_id=ids[name]) for name, (_, citation) in rows.items() if name in ids]
+
+    if citations:
+        db.session.execute(insert(Citation.__table__), citations)
+
+    db.session.commit()
+    return len(ids)
+
+
+class ImportErrors:
+    """Errors of one import
+
+    Only first MAX_REPORTED_ERRORS messages are kept, so memory stays bounded for badly broken files.
+
+    Attributes:
+        count (int): Number of all errors.
+        messages (list): First MAX_REPORTED_ERRORS messages.
+
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.messages: list[str] = []
+
+    def append(self, message: str) -> None:
+        self.count += 1
+        if len(self.messages) < MAX_REPORTED_ERRORS:
+            self.messages.append(message)
+
+
+def import_entries(
+    entries: Iterable[BibtexEntry],
+    batch_size: int = IMPORT_BATCH_SIZE,
+    errors: ImportErrors | None = None,
+) -> dict:
+    """Imports entries into papers and citations
+
+    Entries are written in batches of batch_size, each batch in its own transaction, so memory use does not grow with
+    the number of entries.
+
+    Args:
+        entries (Iterable): Parsed entries.
+        batch_size (int): Number of entries written per transaction.
+        errors (ImportErrors): Parser errors collected so far, invalid entries are added.
+
+    Returns:
+        (dict): Number of created, existing and invalid entries with first MAX_REPORTED_ERRORS errors.
+
+    """
+
+    schemas = get_schemas()
+    errors = errors if errors is not None else ImportErrors()
+    summary = {"created": 0, "exists": 0, "invalid": 0}
+    batch: list[tuple[dict, dict]] = []
+
+    def flush():
+        created = write_batch(batch)
+        summary["created"] += created
+        summary["exists"] += len(batch) - created
+        batch.clear()
+
+    for entry in entries:
+        try:
+            batch.append(validate_entry(entry, schemas))
+        except CitationError as err:
+            errors.append(f"{entry.key}: {err.message}")
+            continue
+
+        if len(batch) >= batch_size:
+            flush()
+
+    flush()
+
+    summary["invalid"] = errors.count
+    summary["errors"] = errors.messages
+    log.info("Imported bibtex: %(created)d created, %(exists)d exists, %(invalid)d invalid", summary)
+    return summary
+
+
+def import_bibtex(stream: TextIO, batch_size: int = IMPORT_BATCH_SIZE) -> dict:
+    """Parses BibTeX stream and imports its entries
+
+    Args:
+        stream (TextIO): Stream of BibTeX text.
+        batch_size (int): Number of entries written per transaction.
+
+    Returns:
+        (dict): Summary from import_entries.
+
+    """
+
+    errors = ImportErrors()
+    return import_entries(iter_entries(stream, on_error=errors.append), batch_size, errors)
+
+
+@invalidates("papers")
+@model_handler
+def post():
+    """Handles paper.post_bibtex request
+
+    Imports .bib file uploaded as "file" form field or sent as request body.
+
+    Returns:
+        (dict, int): Import summary, 201 if any paper is created otherwise 200.
+
+    """
+
+    upload = request.files.get("file")
+    stream = io.TextIOWrapper(upload.stream if upload else request.stream, encoding="utf-8", errors="replace")
+
+    summary = import_bibtex(stream)
+    return summary, 201 if summary["created"] else 200
+
+
+@click.command("import-bibtex")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("-b", "--batch-size", default=IMPORT_BATCH_SIZE, show_default=True, help="Entries per transaction.")
+@with_appcontext
+def import_bibtex_file(path, batch_size):
+    """Imports papers and citations from .bib file
+
+    Args:
+        path (str): Path of .bib file.
+        batch_size (int): Number of entries written per transaction.
+
+    """
+
+    with open(path, "r", encoding="utf-8", errors="replace") as bib_file:
+        summary = import_bibtex(bib_file, batch_size)
+
+    bcolors.print_success(f"Created {summary['created']} papers, {summary['exists']} already exist.")
+    for error in summary["errors"]:
+        bcolors.print_message(error)
+    if summary["invalid"]:
+        bcolors.print_message(f"{summary['invalid']} entries skipped.", "invalid")
+
+
+def iter_manuscript_bibtex(manuscript_id: int, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[str]:
+    """Yields citations of papers associated with manuscript as BibTeX
+
+    Rows are read from server-side cursor in batches of batch_size, so only one batch is held in memory. Every batch
+    is yielded as one chunk of entries.
+
+    Args:
+        manuscript_id (int): ID of manuscript.
+        batch_size (int): Number of rows fetched at once.
+
+    """
+
+    table = Citation.__table__
+    statement = (
+        select(table.c.type, table.c.citation_key, table.c.paper_id, *(table.c[field] for field in EXPORT_FIELDS))
+        .join(manuscript_paper, manuscript_paper.c.paper_id == table.c.paper_id)
+        .where(manuscript_paper.c.manuscript_id == manuscript_id)
+        .order_by(table.c.id)
+    )
+
+    result = db.session.execute(statement, execution_options={"yield_per": batch_size})
+    try:
+        for rows in result.partitions():
+            yield "".join(
+                format_entry(
+                    row.type or "misc",
+                    row.citation_key or f"paper{row.paper_id}",
+                    ((field, getattr(row, field)) for field in EXPORT_FIELDS),
+                )
+                for row in rows
+            )
+    finally:
+        result.close()
+
+
+@model_handler
+def get_manuscript_bibtex(manuscript_id: int):
+    """Handles manuscript.get_bibtex request
+
+    Streams bibliography of manuscript as .bib file.
+
+    Args:
+        manuscript_id (int): ID of manuscript
+
+    Returns:
+        (Response): Streamed BibTeX response.
+
+    Raises:
+        NotFound: Raises if manuscript is not present in database.
+
+    """
+
+    manuscript = db.get_or_404(Manuscript, manuscript_id, description="Manuscript not found in database.")
+
+    return Response(
+        stream_with_context(iter_manuscript_bibtex(manuscript.id)),
+        mimetype="application/x-bibtex",
+        headers={"Content-Disposition": f"attachment; filename=manuscript_{manuscript.id}.bib"},
+    )
+
+
+@click.command("export-bibtex")
+@click.argument("manuscript_id", type=int)
+@click.option("-o", "--output", type=click.File("w", encoding="utf-8"), default="-", help="Output file.")
+@with_appcontext
+def export_bibtex_file(manuscript_id, output):
+    """Exports bibliography of manuscript as .bib file
+
+    Args:
+        manuscript_id (int): ID of manuscript.
+        output (TextIO): Output file.
+
+    """
+
+    if db.session.get(Manuscript, manuscript_id) is None:
+        bcolors.print_warning("Manuscript not found in database.", "ManuscriptNotFoundError")
+        return
+
+    for chunk in iter_manuscript_bibtex(manuscript_id):
+        output.write(chunk)
@@ -1,23 +1,22 @@
-import yaml
+from flask import request
 
 from .helper_models import model_handler
 
 from ...models.data_models import db, Citation
 
 # from ...models.data_models import Citation
+from ..cache import invalidates
+from ..logger import get_logger
+from ..schemas import get_schema
 from .helper_main import get_form_data
 
 
-def get_field_list(paper_type: str):
-    with open("papers.yaml", "r") as t_file:
-        data = yaml.safe_load(t_file)
-    return data[paper_type]
+log = get_logger("citations")
 
 
 @model_handler
 def get(id):
-    print(type(id))
-    print("called:advance get")
+    log.debug("called:advance get %r", id)
     return {
         "request": {
             "url": f"/paper/{id}",
@@ -27,21 +26,23 @@ def get(id):
     }, 200
 
 
+@invalidates("papers")
 @model_handler
 def post(id: str):
     paper_type = get_form_data("paper_type")
     title = "Paper_" + id
-    print(paper_type)
+    log.debug("paper_type = %s", paper_type)
     data = get_citation(paper_type)
 
     if db.session.query(Citation).filter_by(title=title).first():
         raise ValueError
 
-    citation = Citation(title=title, paper_id=id, **data)
+    data["title"] = title
+    citation = Citation(paper_id=id, **data)
     db.session.add(citation)
     db.session.commit()
 
-    print("called:advance post")
+    log.debug("called:advance post")
     return {
         "request": {
             "url": f"/paper/{id}",
@@ -51,31 +52,35 @@ def post(id: str):
     }, 201
 
 
+@invalidates("papers")
 @model_handler
 def update(id, replace=False):
     if replace:
-        print("called:advance put")
+        log.debug("called:advance put")
     else:
-        print("called:advance patch")
+        log.debug("called:advance patch")
 
 
+@invalidates("papers")
 @model_handler
 def delete(id):
-    print("called:advance delete")
+    log.debug("called:advance delete")
 
 
 def get_citation(type: str) -> dict:
-    fields = get_field_list(type)
-    optional_list = fields["optional"]
-    required_list = fields["required"]
-    citation_dict = {}
+    """Validates citation form against schema of its type
 
-    for required_item in required_list:
-        citation_dict[required_item] = get_form_data(required_item, required=True)
+    Args:
+        type (str): Citation type, e.g. "article".
 
-    for optional_item in optional_list:
-        citation_dict[optional_item] = get_form_data(optional_item)
+    Returns:
+        (dict): Citation values by column.
 
-    citation_data = {key: val for key, val in citation_dict.items() if val != ""}
+    Raises:
+        UnknownCitationTypeError: If type is not defined in papers.yaml.
+        MissingFieldsError: If required fields are missing.
 
-    return citation_data
+    """
+
+    schema = get_schema(type)
+    return {"type": schema.type, **schema.validate(request.form)}
@@ -1,39 +1,32 @@
-import configparser
 import getpass
-import json
-import pickle
 import secrets
 from datetime import datetime
+from pathlib import Path
+from typing import Mapping
 
 import click
-import psycopg2
-import psycopg2.errors as pgerr
-from flask import g, request
+from flask import request
 from flask.cli import with_appcontext
-from werkzeug.security import check_password_hash, generate_password_hash
 
-from ...models.data_models import Citation, Manuscript, Paper
-from ...models.data_models import db as dtm_db
-from ...models.data_models import manuscript_paper
+from ...models.base import db
+from ...models.data_models import Citation, Manuscript, Paper, manuscript_paper
 from ...models.users import User
-from ...models.users import db as user_db
-from ..database import close_db, get_db
+from ..database import borrow_connection, close_db
+from ..logger import bcolors
+from ..registry import registry
 
 
-def load_config() -> dict:
+def load_config() -> Mapping:
     """Loads configuration file
 
-    variable:
-        config_file (Wrapper): Holds value of configuration file.
+    Configuration is served from the process wide registry and parsed again only when the file changes.
 
     Returns:
-        config (dict): Configuration dictionary.
+        config (Mapping): Read only configuration mapping.
 
     """
-    with open("config.json") as config_file:
-        config = json.load(config_file)
 
-    return config
+    return registry.get("config")
 
 
 def get_config(key: str) -> str:
@@ -42,87 +35,26 @@ def get_config(key: str) -> str:
     Args:
         key (str): Name of configuration field
 
-    Variables:
-        config (ParserObject): Parser for configuration file.
-
     Returns:
         (str): Value of the configuration field
 
+    Raises:
+        KeyError: If field is not present in metadata of setup.cfg
+
     """
-    config = configparser.ConfigParser()
-    config.read("setup.cfg")
-    return config.get("metadata", key)
+
+    return registry.get("metadata")[key]
 
 
 def get_version() -> str:
     """Get current version of application
 
-    Variables:
-        version_file (Wrapper): Hold value of VERSION file.
-
     Returns:
         version (str): Latest version of citenote application.
 
     """
 
-    with open("VERSION", "r") as version_file:
-        version = version_file.read()
-    return version
-
-
-class bcolors:
-    """Batch shell/Console Colors
-
-    Hold the text color values for batch shell/console.
-
-    Attributes:
-        WARNING (str): Red color for errors/major warnings.
-        SUCCESS (str): Green color for success.
-        MESSAGE (str): Yellow color for message/minor warnings.
-        RESET (str): White color for regular messages and reset colors.
-
-    """
-
-    WARNING = "\u001b[31m"
-    SUCCESS = "\u001b[32m"
-    MESSAGE = "\u001b[33m"
-    RESET = "\u001b[0m"
-
-    @staticmethod
-    def print_warning(message="", error=""):
-        """Print warning
-
-        Print red colored text for major warning and errors
-
-        Args:
-            message (str) = Message provided or ""
-            message (str) = Error provided or ""
-        """
-        print(f"{bcolors.WARNING}{message}\nError: {error}{bcolors.RESET}")
-
-    @staticmethod
-    def print_message(message="", status=""):
-        """Print message
-
-        Print yellow colored text for minor warning and status.
-
-        Args:
-            message (str) = Message provided or ""
-            status (str) = Status provided or ""
-        """
-        status_string = f"({status}) -> " if status else ""
-        print(f"{bcolors.MESSAGE}Status: {status_string}{message}{bcolors.RESET}")
-
-    @staticmethod
-    def print_success(message=""):
-        """Print sucess
-
-        Print green colored text. Used to print message for successfull operation.
-
-        Args:
-            message (str) = Message provided or ""
-        """
-        print(f"{bcolors.SUCCESS}{message}{bcolors.RESET}")
+    return registry.get("version")
 
 
 def get_citenote_data(query):
@@ -131,17 +63,12 @@ def get_citenote_data(query):
     Args:
         query (str): Name of query object.
 
-    Variables:
-        data_file (Wrapper): Holds value of data file.
-
     Returns:
         _val (any): Value of query object.
 
     """
-    with open(r"server/.citenote", "rb") as data_file:
-        _val = pickle.load(data_file)[query]
 
-    return _val
+    return registry.get("citenote_data")[query]
 
 
 def get_form_data(field, required=False, type="TEXT"):
@@ -220,6 +147,8 @@ def get_password():
 def citenote_gen_hash(password: str) -> str:
     """Generate password hash for citenote application
 
+    Hash is computed in the bounded hashing pool with method configured in config.json.
+
     Args:
         password (str): Password provided for hashing
 
@@ -231,18 +160,25 @@ def citenote_gen_hash(password: str) -> str:
     Returns:
         (str): Hashed slat-peppered password
 
+    Raises:
+        HashingBusyError: If hashing pool is busy.
+
     """
 
+    from ..hashing import gen_hash
+
     config = load_config()
     pepper = config["pepper"]
     peppered_password = password + pepper
 
-    return generate_password_hash(peppered_password)
+    return gen_hash(peppered_password)
 
 
 def citenote_check_hash(password: str, hash: str) -> bool:
     """Check password hash for citenote application
 
+    Hash is checked in the bounded hashing pool.
+
     Args:
         password (str): Password provided for checking
         hash (str): Password hash provided for checking
@@ -255,29 +191,111 @@ def citenote_check_hash(password: str, hash: str) -> bool:
     Returns:
         (bool): True if hash and peppered_passowrd matches else false.
 
+    Raises:
+        HashingBusyError: If hashing pool is busy.
+
     """
+    from ..hashing import check_hash
+
     config = load_config()
     pepper = config["pepper"]
     peppered_password = password + pepper
 
-    return check_password_hash(hash, peppered_password)
+    return check_hash(peppered_password, hash)
+
+
+def citenote_needs_rehash(hash: str) -> bool:
+    """Check if password hash uses other method than configured one
+
+    Args:
+        hash (str): Stored password hash
+
+    Returns:
+        (bool): True if password should be hashed again.
+
+    """
+    from ..hashing import needs_rehash
+
+    return needs_rehash(hash)
 
 
 def connect_db(bp):
-    """Connects to database (depr)"""
+    """Connects blueprint to pooled raw connections
 
-    @bp.before_request
-    def before_request():
-        """Get database before request is processed"""
-        g.db = get_db()
+    Connection is borrowed from the engine pool on first get_db call of a request and returned after the request.
+    """
 
     @bp.teardown_request
     def teardown_request(res):
-        """Close database after request is processed"""
+        """Return connection to the pool after request is processed"""
         close_db()
         return res
 
 
+MIGRATIONS_FOLDER = Path(__file__).resolve().parents[2].joinpath("models", "migrations")
+
+# Migration folders by bind, migrations of users table run on the database of "users" bind
+MIGRATION_FOLDERS = {
+    None: MIGRATIONS_FOLDER,
+    "users": MIGRATIONS_FOLDER.joinpath("users"),
+}
+
+
+def apply_migrations(folder: Path = MIGRATIONS_FOLDER, bind_key: str | None = None) -> list[str]:
+    """Applies pending sql migrations
+
+    Migrations are applied in order of their file names, each in its own transaction. Names of applied migrations are
+    stored in citenote_migrations table, so every migration runs once per database.
+
+    Args:
+        folder (Path): Folder with *.sql migration files.
+        bind_key (str): Name of the bind migrations run on (default=None for main engine)
+
+    Returns:
+        applied (list): Names of migrations applied by this call.
+
+    """
+
+    with borrow_connection(bind_key) as connection:
+        cursor = connection.cursor()
+        cursor.execute(
+            "CREATE TABLE IF NOT EXISTS citenote_migrations ("
+            "name VARCHAR PRIMARY KEY, applied_at TIMESTAMP NOT NULL DEFAULT now())"
+        )
+        cursor.execute("SELECT name FROM citenote_migrations")
+        done = {row[0] for row in cursor.fetchall()}
+
+    applied = []
+    for path in sorted(folder.glob("*.sql")):
+        name = f"{bind_key}/{path.name}" if bind_key else path.name
+        if name in done:
+            continue
+
+        with borrow_connection(bind_key) as connection:
+            cursor = connection.cursor()
+            cursor.execute(path.read_text())
+            cursor.execute("INSERT INTO citenote_migrations (name) VALUES (%s)", (name,))
+
+        applied.append(name)
+
+    return applied
+
+
+def apply_all_migrations() -> list[str]:
+    """Applies pending migrations of every bind
+
+    Returns:
+        applied (list): Names of migrations applied by this call.
+
+    """
+
+    applied = []
+    for bind_key, folder in MIGRATION_FOLDERS.items():
+        applied.extend(apply_migrations(folder, bind_key))
+
+    return applied
+
+
 @click.command("init-db")
 @click.option(
     "-f",
@@ -307,6 +325,10 @@ def init_db(force, user):
         Exception("Invalid captcha"): Raise if user entered captch does not matches generated captcha.
 
     """
+    # Imported here, so serving the application does not pay for it
+    import psycopg2
+    import psycopg2.errors as pgerr
+
     try:
         if not validate_superuser(user):
             raise pgerr.InvalidAuthorizationSpecification
@@ -319,19 +341,21 @@ def init_db(force, user):
                 raise Exception("Invalid captcha")
 
             print("Captcha verified")
-            manuscript_paper.drop(dtm_db.engine)
-            Citation.__table__.drop(dtm_db.engine)
-            Manuscript.__table__.drop(dtm_db.engine)
-            Paper.__table__.drop(dtm_db.engine)
-            User.__table__.drop(user_db.engine)
-            # Citation.__table__.drop(dtm_db.engine)
+            manuscript_paper.drop(db.engine)
+            Citation.__table__.drop(db.engine)
+            Manuscript.__table__.drop(db.engine)
+            Paper.__table__.drop(db.engine)
+            User.__table__.drop(db.engines["users"])
+            for bind_key in MIGRATION_FOLDERS:
+                with borrow_connection(bind_key) as connection:
+                    connection.cursor().execute("DROP TABLE IF EXISTS citenote_migrations")
             print("Force initiated database")
 
         else:
             print("Initiated database")
 
-        user_db.create_all()
-        dtm_db.create_all()
+        db.create_all()
+        apply_all_migrations()
 
         bcolors.print_success("Database initiated.")
 
@@ -368,6 +392,9 @@ def create_admin(user):
         InvalidAuthorizationSpecification: If superuser validation fails.
 
     """
+    import psycopg2
+    import psycopg2.errors as pgerr
+
     try:
         if not validate_superuser(user):
             raise pgerr.InvalidAuthorizationSpecification
@@ -381,8 +408,8 @@ def create_admin(user):
         admin.is_staff = True
         admin.is_superuser = True
 
-        user_db.session.add(admin)
-        user_db.session.commit()
+        db.session.add(admin)
+        db.session.commit()
         bcolors.print_success("User admin created!!")
 
     except pgerr.InvalidAuthorizationSpecification:
@@ -393,3 +420,36 @@ def create_admin(user):
 
     except (Exception, psycopg2.Error) as err:
         bcolors.print_warning("Some error occurred during admin creation.", repr(err))
+
+
+@click.command("migrate-db")
+@click.option("-u", "--user")
+@with_appcontext
+def migrate_db(user):
+    """Applies pending migrations to existing database
+
+    Args:
+        user (str): Username provided via shell/console
+
+    Raises:
+        InvalidAuthorizationSpecification: If superuser validation fails.
+
+    """
+    import psycopg2
+    import psycopg2.errors as pgerr
+
+    try:
+        if not validate_superuser(user):
+            raise pgerr.InvalidAuthorizationSpecification
+
+        applied = apply_all_migrations()
+        for name in applied:
+            print(f"Applied {name}")
+
+        bcolors.print_success(f"Database migrated ({len(applied)} migrations applied).")
+
+    except pgerr.InvalidAuthorizationSpecification:
+        bcolors.print_warning("Authentication failed", "InvalidAuthorizationSpecification")
+
+    except (Exception, psycopg2.Error) as err:
+        bcolors.print_warning("Some error occurred during database migration.", repr(err))
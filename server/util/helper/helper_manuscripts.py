@@ -1,26 +1,89 @@
-from ...models.data_models import Manuscript, db
-from ..CitenoteError import ManuscriptFoundError, ManuscriptNotFoundError
+from typing import Mapping
+
+from sqlalchemy import delete as delete_rows, select
+from sqlalchemy.dialects.postgresql import insert
+
+from ...models.data_models import Manuscript, Paper, db, manuscript_paper
+from ..cache import cached, invalidates
+from ..CitenoteError import ManuscriptFoundError, ManuscriptNotFoundError, PaperFoundError, PaperNotFoundError
+from ..logger import get_logger
 from .helper_main import get_form_data
 from .helper_models import (
-    check_papers,
-    get_paper_list,
     get_update_papers_data,
+    model_columns,
     model_formatter,
     model_handler,
     replace_check,
+    row_formatter,
 )
+from .helper_pagination import Ordering, Page, get_limit, get_ordering, get_page, get_total
+
+
+log = get_logger("manuscripts")
+
+MANUSCRIPT_SORT_FIELDS = {
+    "id": Manuscript.id,
+    "name": Manuscript.name,
+}
+
+PAPER_SORT_FIELDS = {
+    "id": Paper.id,
+    "name": Paper.name,
+}
 
 
+def get_manuscripts_page(args: Mapping | None = None) -> Page:
+    """Returns page of manuscripts requested with "limit", "after" and "sort" queries
+
+    Args:
+        args (Mapping): Query arguments (default=request.args)
+
+    """
+
+    ordering = get_ordering(MANUSCRIPT_SORT_FIELDS, "id", Ordering("id", Manuscript.id), args)
+    return get_page(select(*model_columns(Manuscript)), ordering, get_limit(args=args), args)
+
+
+def get_papers_statement(manuscript_id: int):
+    """Returns select statement of columns of papers associated with manuscript"""
+
+    return (
+        select(*model_columns(Paper))
+        .join(manuscript_paper, manuscript_paper.c.paper_id == Paper.id)
+        .where(manuscript_paper.c.manuscript_id == manuscript_id)
+    )
+
+
+def get_papers_page(manuscript_id: int, args: Mapping | None = None) -> Page:
+    """Returns page of papers associated with manuscript requested with "limit", "after" and "sort" queries
+
+    Args:
+        manuscript_id (int): ID of manuscript
+        args (Mapping): Query arguments (default=request.args)
+
+    """
+
+    ordering = get_ordering(PAPER_SORT_FIELDS, "id", Ordering("id", Paper.id), args)
+    return get_page(get_papers_statement(manuscript_id), ordering, get_limit(args=args), args)
+
+
+@cached("manuscripts")
 @model_handler
 def get():
     """Handles manuscript.get request
 
-    Get manuscript object from database.
+    Get manuscript object from database. Without manuscript name, returns a page of manuscripts.
+
+    Queries:
+        limit (int): Page size (default=50, max=500)
+        after (str): Cursor of the page, returned as "next" with previous page.
+        sort (str): "id" or "name", prefixed with "-" for descending order (default="id")
+        count (str): "true" for total count or "estimate" for planner estimate.
 
     Variables:
         manuscript_name (str): Name of the manuscript.
         manuscript (Manuscript): Manuscript object if present in dataset.
-        manuscript_list (list): List of the manuscript objects.
+        manuscript_list (list): Rows of id, name and abstract of the manuscripts.
         formatted_manuscript_list (list): List of formatted manuscript objects.
         val (dict): Response dictionary
 
@@ -40,18 +103,24 @@ def get():
         val = model_formatter(object=manuscript)
 
     else:
-        manuscript_list: list = Manuscript.query.all()
-        if not manuscript_list:
+        page = get_manuscripts_page()
+        manuscript_list = db.session.execute(page.statement).all()
+        if not manuscript_list and not page.after:
             raise ManuscriptNotFoundError
-        formatted_manuscript_list = []
-        for manuscript in manuscript_list:
-            formatted_manuscript_list.append(model_formatter(object=manuscript))
 
-        val = {"count": len(manuscript_list), "results": formatted_manuscript_list}
+        manuscript_list, cursor = page.split(manuscript_list)
+        formatted_manuscript_list = [row_formatter(manuscript) for manuscript in manuscript_list]
+
+        val = {"count": len(manuscript_list), "results": formatted_manuscript_list, "next": cursor}
+
+        total = get_total(select(Manuscript), Manuscript.__tablename__)
+        if total is not None:
+            val["total"] = total
 
     return val, 200
 
 
+@invalidates("manuscripts")
 @model_handler
 def post():
     """Handles manuscript.post request
@@ -82,6 +151,7 @@ def post():
     return {}, 201
 
 
+@invalidates("manuscripts")
 @model_handler
 def update(replace=False):
     """Handles manuscript.update request
@@ -116,20 +186,21 @@ def update(replace=False):
         return {}, 204
 
     if updated_id:
-        print("Updated the id to:", updated_id)
+        log.debug("Updated the id to: %s", updated_id)
         manuscript.id = int(updated_id)
 
     if updated_name:
-        print("Updated the name to:", updated_name)
+        log.debug("Updated the name to: %s", updated_name)
         manuscript.name = updated_name
 
     if updated_abstract:
-        print("Updated the abstract to:", updated_abstract)
+        log.debug("Updated the abstract to: %s", updated_abstract)
         manuscript.abstract = updated_abstract
 
     db.session.commit()
 
 
+@invalidates("manuscripts")
 @model_handler
 def delete():
     """Handles manuscript.delete request
@@ -155,76 +226,113 @@ def delete():
     db.session.commit()
 
 
+@cached("manuscripts", "papers")
 @model_handler
-def get_paper(manuscript_id: str):
+def get_paper(manuscript_id: int):
     """Handles manuscript.get_paper request
 
-    Get list of associated papers.
+    Get page of associated papers. Papers are fetched with single join query over association table. Manuscript
+    without papers gets an empty page.
 
     Args:
-        manuscript_id (str): ID of manuscript
+        manuscript_id (int): ID of manuscript
+
+    Queries:
+        limit (int): Page size (default=50, max=500)
+        after (str): Cursor of the page, returned as "next" with previous page.
+        sort (str): "id" or "name", prefixed with "-" for descending order (default="id")
+        count (str): "true" for total count of associated papers.
+
     Variables:
-        manuscript (Manuscript): Manuscript object
-        papers (list): List of paper associated with manuscript
+        papers (list): Rows of id, name and abstract of papers associated with manuscript
         formatted_papers (list): List of formatted papers associated with manuscript
 
     Returns:
         (dict, int): Return the response to the user.
 
+    Raises:
+        NotFound: Raises if manuscript is not present in database.
+
     """
 
-    manuscript: Manuscript = Manuscript.query.filter_by(id=manuscript_id).first()
-    papers = get_paper_list(manuscript)
-    if not papers:
-        return {}, 200
-    formatted_papers = []
-    for paper in papers:
-        formatted_papers.append(model_formatter(paper))
+    db.get_or_404(Manuscript, manuscript_id, description="Manuscript not found in database.")
+
+    page = get_papers_page(manuscript_id)
+    papers, cursor = page.split(db.session.execute(page.statement).all())
+    formatted_papers = [row_formatter(paper) for paper in papers]
 
     val = {
         "count": len(papers),
         "results": formatted_papers,
+        "next": cursor,
     }
 
+    total = get_total(select(manuscript_paper).where(manuscript_paper.c.manuscript_id == manuscript_id))
+    if total is not None:
+        val["total"] = total
+
     return val, 200
 
 
+@invalidates("manuscripts")
 @model_handler
-def add_paper(manuscript_id: str):
+def add_paper(manuscript_id: int):
     """Handles manuscript.add_paper request
 
-    Add paper to association.
+    Add paper to association. Duplicate association is detected by primary key of association table, so concurrent
+    requests cannot insert the same pair twice.
 
     Args:
-        manuscript_id (str): ID of manuscript
+        manuscript_id (int): ID of manuscript
     Variables:
         manuscript (Manuscript): Manuscript object
         paper (Paper): paper object
 
+    Raises:
+        PaperFoundError: Raises if paper is already associated with manuscript.
+
     """
 
     manuscript, paper = get_update_papers_data(manuscript_id)
-    check_papers(manuscript, paper)
-    manuscript.papers.append(paper)
+    statement = (
+        insert(manuscript_paper)
+        .values(manuscript_id=manuscript.id, paper_id=paper.id)
+        .on_conflict_do_nothing(index_elements=["manuscript_id", "paper_id"])
+    )
+
+    if not db.session.execute(statement).rowcount:
+        raise PaperFoundError
+
     db.session.commit()
 
 
+@invalidates("manuscripts")
 @model_handler
-def remove_paper(manuscript_id: str):
+def remove_paper(manuscript_id: int):
     """Handles manuscript.remove_paper request
 
     Remove paper from association.
 
     Args:
-        manuscript_id (str): ID of manuscript
+        manuscript_id (int): ID of manuscript
     Variables:
         manuscript (Manuscript): Manuscript object
         paper (Paper): paper object
 
+    Raises:
+        PaperNotFoundError: Raises if paper is not associated with manuscript.
+
     """
 
     manuscript, paper = get_update_papers_data(manuscript_id)
-    manuscript.papers.remove(paper)
+    statement = delete_rows(manuscript_paper).where(
+        manuscript_paper.c.manuscript_id == manuscript.id,
+        manuscript_paper.c.paper_id == paper.id,
+    )
+
+    if not db.session.execute(statement).rowcount:
+        raise PaperNotFoundError
+
     db.session.commit()
 
 
@@ -1,15 +1,22 @@
 import functools
 from typing import Callable, Tuple
 
+from werkzeug.exceptions import HTTPException
+
 from ...models.data_models import Manuscript, Paper, db
 from ..CitenoteError import (
+    CitationError,
     ManuscriptFoundError,
     ManuscriptNotFoundError,
     PaperFoundError,
     PaperNotFoundError,
     SameValueError,
 )
-from .helper_main import bcolors, get_form_data
+from ..logger import get_logger
+from .helper_main import get_form_data
+
+
+log = get_logger("models")
 
 
 def replace_check(
@@ -32,15 +39,15 @@ def replace_check(
     """
 
     if replace and updated_id:
-        bcolors.print_message("Id is immutable in replace operation")
+        log.info("Id is immutable in replace operation")
         return False
 
     elif replace and not all((updated_name, updated_abstract)):
-        bcolors.print_message("Missing data.")
+        log.info("Missing data.")
         return False
 
     elif not any((updated_id, updated_name, updated_abstract)):
-        bcolors.print_message("No input was provided, hence no modifications were made.")
+        log.info("No input was provided, hence no modifications were made.")
         return False
 
     else:
@@ -50,6 +57,8 @@ def replace_check(
 def model_handler(func: Callable) -> Callable:
     """Handles error for route helpers
 
+    HTTP errors raised by the function (e.g. abort(404)) are passed on to the registered error handlers.
+
     Args:
         func (Callable): Function to run inside the wrapper
 
@@ -81,6 +90,9 @@ def model_handler(func: Callable) -> Callable:
                 return response
             return {}, 200
 
+        except HTTPException:
+            raise
+
         except (
             ManuscriptFoundError,
             ManuscriptNotFoundError,
@@ -91,19 +103,23 @@ def model_handler(func: Callable) -> Callable:
             err.print_error()
             return {}, 500
 
+        except CitationError as err:
+            err.print_error()
+            return {"status": 400, "message": err.message}, 400
+
         except ValueError as err:
-            bcolors.print_warning("Wrong input type", repr(err))
+            log.warning("Wrong input type - Error: %r", err)
             return {}, 500
 
         except Exception as err:
-            bcolors.print_warning(f"'{operation_name}' operation failed", repr(err))
+            log.error("'%s' operation failed - Error: %r", operation_name, err)
             return {}, 500
 
     return wrapper
 
 
 def update_message(field_name: str, val: str | int) -> None:
-    """Prints update message
+    """Logs update message
 
     Args:
         field_name (str): Name of the field updated.
@@ -111,13 +127,13 @@ def update_message(field_name: str, val: str | int) -> None:
 
     """
 
-    bcolors.print_success(f"Updated {field_name} to: {str(val)}")
+    log.debug("Updated %s to: %s", field_name, val)
 
 
 def update_field(field: str | int, field_name: str, val: str | int):
     """Return updated value for assignment.
 
-    Check new value and old value. If new value is different prints message and returns old value.
+    Check new value and old value. If new value is different logs message and returns old value.
 
     Args:
         field (str | int): Current value of the field.
@@ -161,13 +177,43 @@ def model_formatter(object: Manuscript | Paper) -> dict:
     return val
 
 
-def get_update_papers_data(manuscript_id: str):
+def model_columns(model: type[Manuscript] | type[Paper]) -> tuple:
+    """Returns columns of model formatted by model_formatter
+
+    Lists select these columns instead of whole objects, so rows are not hydrated into ORM objects.
+
+    Args:
+        model (type): Manuscript or Paper model.
+
+    Returns:
+        (tuple): Id, name and abstract columns.
+
+    """
+
+    return model.id, model.name, model.abstract
+
+
+def row_formatter(row) -> dict:
+    """Formats row selected with model_columns, same output as model_formatter
+
+    Row is unpacked as tuple, which is much faster than attribute access on rows.
+    """
+
+    id, name, abstract = row
+    return {
+        "id": id,
+        "name": name,
+        "abstract": abstract,
+    }
+
+
+def get_update_papers_data(manuscript_id: int):
     """Returns manuscript and paper objects
 
     Get manuscript and paper object from provided ids.
 
     Args:
-        manuscript_id (str): ID of required manuscript
+        manuscript_id (int): ID of required manuscript
 
     Variables:
         paper_id (str): ID of required paper.
@@ -177,48 +223,23 @@ def get_update_papers_data(manuscript_id: str):
         paper (Paper): Paper object
 
     Raises:
+        ManuscriptNotFoundError: Raises if manuscript not found in database.
         PaperNotFoundError: Raises if paper not found in database.
 
     """
 
-    manuscript: Manuscript = Manuscript.query.filter_by(id=manuscript_id).first()
+    manuscript: Manuscript = db.session.get(Manuscript, manuscript_id)
     paper_id = get_form_data("paper_id")
 
+    if not manuscript:
+        raise ManuscriptNotFoundError
+
     if not paper_id:
         raise ValueError("Paper ID not provided")
 
-    paper: Paper = Paper.query.filter_by(id=paper_id).first()
+    paper: Paper = db.session.get(Paper, int(paper_id))
 
     if not paper:
         raise PaperNotFoundError
 
     return manuscript, paper
-
-
-def get_paper_list(manuscript: Manuscript):
-    """Get list of papers associated with manuscript
-
-    Args:
-        manuscripts (Manuscript): Manuscript object
-
-    """
-
-    return [paper[0] for paper in db.session.execute(manuscript.papers).all()]
-
-
-def check_papers(manuscript: Manuscript, paper: Paper):
-    """Check if paper is already associated with manuscript
-
-    Args:
-        manuscripts (Manuscript): Manuscript object
-        paper (Paper): Paper object
-
-    Raise:
-        PaperFoundError: Raises if paper is associated with manuscript
-
-    """
-
-    papers = get_paper_list(manuscript)
-    paper_ids = [paper.id for paper in papers]
-    if paper.id in paper_ids:
-        raise PaperFoundError
@@ -0,0 +1,303 @@
+"""helper_pagination.py
+
+Provides keyset (cursor) pagination for list routes.
+
+Rows are ordered by one indexed column and the primary key as tie breaker. Cursor holds the ordering values of the
+last row of a page, next page continues strictly after these values, so every page costs one index range scan no
+matter how deep the client has paged.
+"""
+
+import base64
+import binascii
+import json
+from typing import Any, Mapping, NamedTuple, Sequence
+
+from flask import abort, request
+from sqlalchemy import func, select, text, tuple_
+
+from ...models.base import db
+
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+
+class Ordering(NamedTuple):
+    """Ordering column of a page
+
+    Attributes:
+        name (str): Attribute name of the value on result rows/objects.
+        column (ColumnElement): Column or expression to order by.
+        descending (bool): True for descending order.
+
+    """
+
+    name: str
+    column: Any
+    descending: bool = False
+
+
+def encode_cursor(values: Sequence) -> str:
+    """Encodes ordering values into opaque cursor"""
+
+    return base64.urlsafe_b64encode(json.dumps(list(values)).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    """Decodes cursor into ordering values
+
+    Raises:
+        BadRequest: If cursor is malformed.
+
+    """
+
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode() + b"=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeError, ValueError):
+        values = None
+
+    if not isinstance(values, list):
+        abort(400, description="Invalid cursor.")
+
+    return values
+
+
+def is_cursor_value(value: Any, column) -> bool:
+    """Returns True if cursor value can be compared with ordering column
+
+    Values are checked against python type of the column, e.g. int for id and str for name. Columns without known
+    python type accept any value except null.
+    """
+
+    if value is None or isinstance(value, bool):
+        return False
+
+    try:
+        expected = column.type.python_type
+    except NotImplementedError:
+        return True
+
+    if expected is float:
+        return isinstance(value, (int, float))
+
+    return isinstance(value, expected)
+
+
+def get_limit(default: int = DEFAULT_LIMIT, maximum: int = MAX_LIMIT, args: Mapping | None = None) -> int:
+    """Returns page size from "limit" query
+
+    Args:
+        default (int): Page size used when none is provided.
+        maximum (int): Largest allowed page size.
+        args (Mapping): Query arguments (default=request.args)
+
+    Raises:
+        BadRequest: If limit is not a positive integer.
+
+    """
+
+    args = request.args if args is None else args
+    limit = args.get("limit")
+    if limit is None:
+        return default
+
+    try:
+        limit = int(limit)
+    except ValueError:
+        limit = 0
+
+    if limit < 1:
+        abort(400, description="Limit must be a positive integer.")
+
+    return min(limit, maximum)
+
+
+def get_ordering(
+    sort_fields: dict,
+    default: str,
+    tie_breaker: Ordering,
+    args: Mapping | None = None,
+) -> list[Ordering]:
+    """Returns ordering from "sort" query
+
+    Sort query is name of the field, prefixed with "-" for descending order, e.g. "name" or "-name".
+
+    Args:
+        sort_fields (dict): Allowed field names mapped to their columns.
+        default (str): Sort query used when none is provided.
+        tie_breaker (Ordering): Unique column appended to the ordering.
+        args (Mapping): Query arguments (default=request.args)
+
+    Raises:
+        BadRequest: If field is not allowed.
+
+    """
+
+    args = request.args if args is None else args
+    sort = args.get("sort", default)
+    descending = sort.startswith("-")
+    name = sort[1:] if descending else sort
+
+    if name not in sort_fields:
+        abort(400, description=f"Unknown sort field: {name}.")
+
+    ordering = [Ordering(name, sort_fields[name], descending)]
+    if name != tie_breaker.name:
+        ordering.append(tie_breaker._replace(descending=descending))
+
+    return ordering
+
+
+class Page(NamedTuple):
+    """Paginated statement with values needed to split its rows
+
+    Attributes:
+        statement (Select): Statement from paginate.
+        ordering (list): Ordering of the rows.
+        limit (int): Page size.
+        after (str | None): Cursor the page continues after.
+
+    """
+
+    statement: Any
+    ordering: list[Ordering]
+    limit: int
+    after: str | None
+
+    def split(self, rows: Sequence) -> tuple[list, str | None]:
+        """Splits fetched rows into page and cursor of the next page"""
+
+        return next_page(rows, self.ordering, self.limit)
+
+
+def get_page(statement, ordering: list[Ordering], limit: int, args: Mapping | None = None) -> Page:
+    """Paginates statement after cursor from "after" query
+
+    Args:
+        statement (Select): Select statement for the rows.
+        ordering (list): Ordering of the rows.
+        limit (int): Page size.
+        args (Mapping): Query arguments (default=request.args)
+
+    Raises:
+        BadRequest: If cursor does not match ordering.
+
+    """
+
+    after = (request.args if args is None else args).get("after")
+    return Page(paginate(statement, ordering, limit, after), ordering, limit, after)
+
+
+def paginate(statement, ordering: list[Ordering], limit: int, after: str | None = None):
+    """Applies keyset condition, ordering and limit to select statement
+
+    One extra row is requested, so next_page can tell whether another page exists.
+
+    Args:
+        statement (Select): Select statement for the rows.
+        ordering (list): Ordering of the rows. All entries must share the same direction.
+        limit (int): Page size.
+        after (str): Cursor returned with previous page.
+
+    Returns:
+        statement (Select): Paginated select statement.
+
+    Raises:
+        BadRequest: If cursor does not match ordering.
+
+    """
+
+    if after:
+        values = decode_cursor(after)
+        if len(values) != len(ordering) or not all(
+            is_cursor_value(value, order.column) for value, order in zip(values, ordering)
+        ):
+            abort(400, description="Invalid cursor.")
+
+        columns = tuple_(*(order.column for order in ordering))
+        if ordering[0].descending:
+            statement = statement.where(columns < tuple_(*values))
+        else:
+            statement = statement.where(columns > tuple_(*values))
+
+    order_by = [order.column.desc() if order.descending else order.column.asc() for order in ordering]
+    return statement.order_by(*order_by).limit(limit + 1)
+
+
+def next_page(rows: Sequence, ordering: list[Ordering], limit: int) -> tuple[list, str | None]:
+    """Splits fetched rows into page and cursor of the next page
+
+    Args:
+        rows (Sequence): Rows fetched with statement from paginate.
+        ordering (list): Ordering used by paginate.
+        limit (int): Page size used by paginate.
+
+    Returns:
+        rows (list): Rows of the page.
+        cursor (str | None): Cursor of next page or None for last page.
+
+    """
+
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    return rows, encode_cursor([getattr(rows[-1], order.name) for order in ordering])
+
+
+def get_count_statement(statement):
+    """Returns statement counting rows of statement"""
+
+    return select(func.count()).select_from(statement.order_by(None).subquery())
+
+
+def get_total_statement(statement, table_name: str | None = None, args: Mapping | None = None):
+    """Returns statement of total row count requested with "count" query
+
+    "count=true" counts rows of statement. "count=estimate" returns planner estimate of the table, which costs no scan.
+    Estimate is negative while the table was never analyzed, callers count rows of statement instead.
+
+    Args:
+        statement (Select): Statement whose rows are counted.
+        table_name (str): Table used for estimate.
+        args (Mapping): Query arguments (default=request.args)
+
+    Returns:
+        (Executable | None): Statement returning the count or None if not requested.
+
+    """
+
+    count = (request.args if args is None else args).get("count", "").lower()
+    if count in ("", "false", "0"):
+        return None
+
+    if count == "estimate" and table_name:
+        return text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)").bindparams(
+            table=table_name
+        )
+
+    return get_count_statement(statement)
+
+
+def get_total(statement, table_name: str | None = None) -> int | None:
+    """Returns total row count requested with "count" query
+
+    Args:
+        statement (Select): Statement whose rows are counted.
+        table_name (str): Table used for estimate.
+
+    Returns:
+        (int | None): Count or None if not requested.
+
+    """
+
+    total = get_total_statement(statement, table_name)
+    if total is None:
+        return None
+
+    value = db.session.scalar(total)
+    if value is None or value < 0:
+        value = db.session.scalar(get_count_statement(statement))
+
+    return int(value)
@@ -1,9 +1,74 @@
+import json
+from typing import Any, Iterator, Mapping
+
+from flask import abort, request
+from sqlalchemy import Double, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+
 from ...models.data_models import Paper, db
+from ..cache import cached, invalidates
 from ..CitenoteError import PaperFoundError, PaperNotFoundError
+from ..logger import get_logger
 from .helper_main import get_form_data
 from .helper_models import model_handler, replace_check, update_field
+from .helper_pagination import Ordering, Page, get_limit, get_page
+
+
+log = get_logger("papers")
+
+BULK_BATCH_SIZE = 1000
+NDJSON_MIMETYPES = ("application/x-ndjson", "application/jsonl", "application/json-lines")
+
+SEARCH_CONFIG = "english"
+HEADLINE_OPTIONS = "MaxFragments=2, MaxWords=30, MinWords=10"
+
+SIMILAR_THRESHOLD = 0.5
+SIMILAR_LIMIT = 10
+SIMILAR_MAX_LIMIT = 50
+SIMILAR_WARNING_LIMIT = 3
+
+# True when pg_trgm extension and citenote_normalize are installed by migration 0003_trigram_similarity.sql
+SIMILARITY_AVAILABLE_SQL = text(
+    "SELECT to_regprocedure('citenote_normalize(text)') IS NOT NULL "
+    "AND EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')"
+)
+
+# Papers whose normalized name or citation title is similar to each of :names, best matches first. Both branches are
+# served by trigram GiST indexes of migration 0003_trigram_similarity.sql.
+SIMILAR_PAPERS_SQL = text(
+    """
+    SELECT q.name AS query, m.id, m.name, m.score
+    FROM unnest(CAST(:names AS varchar[])) AS q(name)
+    CROSS JOIN LATERAL (
+        SELECT c.id, p.name, max(c.score) AS score
+        FROM (
+            (
+                SELECT id, similarity(citenote_normalize(name), citenote_normalize(q.name)) AS score
+                FROM papers
+                WHERE citenote_normalize(name) % citenote_normalize(q.name)
+                ORDER BY citenote_normalize(name) <-> citenote_normalize(q.name)
+                LIMIT :limit
+            )
+            UNION ALL
+            (
+                SELECT paper_id, similarity(citenote_normalize(title), citenote_normalize(q.name))
+                FROM citations
+                WHERE paper_id IS NOT NULL AND citenote_normalize(title) % citenote_normalize(q.name)
+                ORDER BY citenote_normalize(title) <-> citenote_normalize(q.name)
+                LIMIT :limit
+            )
+        ) c
+        JOIN papers p ON p.id = c.id
+        GROUP BY c.id, p.name
+        ORDER BY score DESC, c.id
+        LIMIT :limit
+    ) m
+    """
+)
 
 
+@cached("papers")
 @model_handler
 def get():
     """Handles paper.get request
@@ -38,12 +103,16 @@ def get():
     return val, 200
 
 
+@invalidates("papers")
 @model_handler
 def post():
     """Handles paper.post request
 
     Create user object in database.
 
+    Queries:
+        check_similar (str): "true" to return papers with similar names as warning.
+
     Variables:
         paper_name (str): Name of the paper.
         paper_abstract (str): Abstract of the paper.
@@ -63,13 +132,19 @@ def post():
     if Paper.query.filter_by(name=paper_name).first():
         raise PaperFoundError
 
+    similar_papers = check_similar([paper_name]).get(paper_name) if is_check_similar() else None
+
     paper = Paper(name=paper_name, abstract=paper_abstract)
     db.session.add(paper)
     db.session.commit()
 
+    if similar_papers:
+        return {"warning": "Similar papers exist.", "similar": similar_papers}, 201
+
     return {}, 201
 
 
+@invalidates("papers")
 @model_handler
 def update(replace: bool = False):
     """Handles paper.update request
@@ -115,6 +190,7 @@ def update(replace: bool = False):
     db.session.commit()
 
 
+@invalidates("papers")
 @model_handler
 def delete():
     """Handles paper.delete request
@@ -140,5 +216,365 @@ def delete():
     db.session.commit()
 
 
+def read_bulk_records() -> Iterator[Any]:
+    """Reads paper records from request body
+
+    JSON array bodies are parsed at once. NDJSON bodies (one JSON object per line) are read line by line from the
+    request stream.
+
+    Yields:
+        record (Any): Decoded record.
+
+    Raises:
+        BadRequest: If JSON body is not an array or NDJSON line is not valid JSON.
+
+    """
+
+    if request.mimetype in NDJSON_MIMETYPES:
+        for number, line in enumerate(request.stream, 1):
+            line = line.strip()
+            if not line:
+                continue
+
+            try:
+                yield json.loads(line)
+            except ValueError as err:
+                abort(400, description=f"Invalid JSON on line {number}: {err}")
+
+        return
+
+    records = request.get_json()
+    if not isinstance(records, list):
+        abort(400, description="Expected JSON array of papers.")
+
+    yield from records
+
+
+def validate_paper_record(record: Any) -> tuple[str, str | None]:
+    """Validates paper record of bulk request
+
+    Args:
+        record (Any): Decoded record with "name" and optional "abstract".
+
+    Returns:
+        (tuple): Name and abstract of paper.
+
+    Raises:
+        ValueError: If record is not valid.
+
+    """
+
+    if not isinstance(record, dict):
+        raise ValueError("Record must be an object")
+
+    name = record.get("name")
+    abstract = record.get("abstract")
+
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError("Name must be a non empty string")
+
+    if abstract is not None and not isinstance(abstract, str):
+        raise ValueError("Abstract must be a string")
+
+    return name, abstract
+
+
+def insert_papers(rows: list[dict]) -> dict[str, int]:
+    """Inserts papers in single statement
+
+    Papers whose name already exists are skipped by the unique constraint on name, so existence check and insert are
+    done by the same query. Transaction is not committed.
+
+    Args:
+        rows (list): Dictionaries with "name" and "abstract" of papers. Names must be unique within rows.
+
+    Returns:
+        (dict): Ids of inserted papers by their name.
+
+    """
+
+    if not rows:
+        return {}
+
+    table = Paper.__table__
+    statement = (
+        insert(table)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=[table.c.name])
+        .returning(table.c.id, table.c.name)
+    )
+    return {name: id for id, name in db.session.execute(statement)}
+
+
+@invalidates("papers")
+@model_handler
+def post_bulk():
+    """Handles paper.post_bulk request
+
+    Creates papers from JSON array or NDJSON body in batches of BULK_BATCH_SIZE, within one transaction. Body that
+    cannot be decoded is rejected as a whole and nothing is created.
+
+    Every record gets an outcome with its index:
+        created: Paper is inserted.
+        exists: Paper with same name is already in database.
+        duplicate: Same name appeared earlier in the request.
+        invalid: Record failed validation.
+
+    Queries:
+        check_similar (str): "true" to add papers with similar names to outcomes of created papers.
+
+    Variables:
+        results (list): Outcome of every record.
+        pending (list): Outcomes of records in current batch.
+        seen (set): Names already in the request.
+
+    Returns:
+        (dict, int): Summary and outcomes, 201 if any paper is created otherwise 200.
+
+    """
+
+    results: list[dict] = []
+    pending: list[dict] = []
+    seen: set[str] = set()
+
+    check = is_check_similar()
+
+    def flush():
+        similar_papers = check_similar([item["name"] for item in pending]) if check else {}
+        ids = insert_papers([{"name": item["name"], "abstract": item.pop("abstract")} for item in pending])
+        for item in pending:
+            if item["name"] in ids:
+                item.update(status="created", id=ids[item["name"]])
+                if similar_papers.get(item["name"]):
+                    item["similar"] = similar_papers[item["name"]]
+            else:
+                item["status"] = "exists"
+        pending.clear()
+
+    for index, record in enumerate(read_bulk_records()):
+        try:
+            name, abstract = validate_paper_record(record)
+        except ValueError as err:
+            results.append({"index": index, "status": "invalid", "error": str(err)})
+            continue
+
+        if name in seen:
+            results.append({"index": index, "name": name, "status": "duplicate"})
+            continue
+
+        seen.add(name)
+        item = {"index": index, "name": name, "abstract": abstract}
+        results.append(item)
+        pending.append(item)
+
+        if len(pending) >= BULK_BATCH_SIZE:
+            flush()
+
+    flush()
+    db.session.commit()
+
+    summary = {status: 0 for status in ("created", "exists", "duplicate", "invalid")}
+    for item in results:
+        summary[item["status"]] += 1
+
+    return {**summary, "results": results}, 201 if summary["created"] else 200
+
+
+@model_handler
+def search():
+    """Handles paper.search request
+
+    Full-text search over paper name, abstract and author, title and journal of its citation. Results are ranked with
+    ts_rank_cd and matched terms are highlighted with <b> tags.
+
+    Queries:
+        q (str): Search query in web search syntax, e.g. "attention -recurrent" or "\"neural machine\"".
+        limit (int): Page size (default=50, max=500)
+        after (str): Cursor of the page, returned as "next" with previous page.
+
+    Returns:
+        (dict, int): Page of matching papers, best match first.
+
+    Raises:
+        BadRequest: If query is missing, or limit or cursor is invalid.
+
+    """
+
+    page = get_search_page()
+    rows, cursor = page.split(db.session.execute(page.statement).all())
+
+    return {
+        "count": len(rows),
+        "results": [format_search_row(row) for row in rows],
+        "next": cursor,
+    }, 200
+
+
+def get_search_page(args: Mapping | None = None) -> Page:
+    """Returns page of search results requested with "q", "limit" and "after" queries
+
+    Args:
+        args (Mapping): Query arguments (default=request.args)
+
+    Raises:
+        BadRequest: If query is missing, or limit or cursor is invalid.
+
+    """
+
+    args = request.args if args is None else args
+    terms = args.get("q", "").strip()
+    if not terms:
+        abort(400, description="Missing search query.")
+
+    query = func.websearch_to_tsquery(SEARCH_CONFIG, terms)
+    # real rank is cast to double, so the cursor value round-trips exactly
+    rank = func.ts_rank_cd(Paper.search_vector, query).cast(Double)
+    ordering = [Ordering("rank", rank, True), Ordering("id", Paper.id, True)]
+
+    statement = select(
+        Paper.id,
+        Paper.name,
+        rank.label("rank"),
+        func.ts_headline(SEARCH_CONFIG, Paper.name, query, "HighlightAll=true").label("name_highlight"),
+        func.ts_headline(SEARCH_CONFIG, func.coalesce(Paper.abstract, ""), query, HEADLINE_OPTIONS).label(
+            "abstract_highlight"
+        ),
+    ).where(Paper.search_vector.op("@@")(query))
+
+    return get_page(statement, ordering, get_limit(args=args), args)
+
+
+def format_search_row(row) -> dict:
+    """Formats row of search results"""
+
+    return {
+        "id": row.id,
+        "name": row.name,
+        "rank": round(row.rank, 6),
+        "highlight": {"name": row.name_highlight, "abstract": row.abstract_highlight},
+    }
+
+
+_similarity_available = False
+
+
+def is_similarity_available() -> bool:
+    """Returns True if database supports trigram similarity
+
+    Positive result is kept for the process. Missing extension is checked again on every call, so lookups start
+    working once the extension is installed and migration 0003 is run again.
+    """
+
+    global _similarity_available
+
+    if not _similarity_available:
+        _similarity_available = bool(db.session.scalar(SIMILARITY_AVAILABLE_SQL))
+
+    return _similarity_available
+
+
+def set_similarity_threshold(threshold: float) -> None:
+    """Sets minimum trigram similarity of % operator for current transaction"""
+
+    db.session.execute(select(func.set_config("pg_trgm.similarity_threshold", str(threshold), True)))
+
+
+def find_similar(
+    names: list[str],
+    limit: int = SIMILAR_LIMIT,
+    threshold: float = SIMILAR_THRESHOLD,
+) -> dict[str, list[dict]]:
+    """Finds papers with names or citation titles similar to each name
+
+    Similarity is trigram similarity of normalized strings, from 0 to 1. All names are looked up with single query.
+
+    Args:
+        names (list): Names to look up.
+        limit (int): Maximum number of papers per name.
+        threshold (float): Minimum similarity.
+
+    Returns:
+        (dict): Similar papers ("id", "name", "score") by looked up name, best match first.
+
+    """
+
+    if not names:
+        return {}
+
+    set_similarity_threshold(threshold)
+    similar: dict[str, list[dict]] = {}
+    for row in db.session.execute(SIMILAR_PAPERS_SQL, {"names": names, "limit": limit}):
+        similar.setdefault(row.query, []).append({"id": row.id, "name": row.name, "score": round(row.score, 6)})
+
+    return similar
+
+
+def is_check_similar() -> bool:
+    """Returns True if request opted in to similar paper warnings"""
+
+    return request.args.get("check_similar", "").lower() in ("1", "true", "yes")
+
+
+def check_similar(names: list[str]) -> dict[str, list[dict]]:
+    """Returns near duplicates of names about to be created, exact matches are left out
+
+    Check never fails the create: if similarity is not available or lookup fails, the failure is logged and no near
+    duplicates are returned. Lookup runs in a savepoint, so a failed lookup does not abort the transaction.
+    """
+
+    if not is_similarity_available():
+        log.warning("Similar paper check skipped, pg_trgm extension is not installed")
+        return {}
+
+    try:
+        with db.session.begin_nested():
+            similar = find_similar(names, SIMILAR_WARNING_LIMIT)
+    except SQLAlchemyError as err:
+        log.warning("Similar paper check failed - Error: %r", err)
+        return {}
+
+    return {
+        name: [paper for paper in papers if paper["name"] != name]
+        for name, papers in similar.items()
+    }
+
+
+@model_handler
+def similar():
+    """Handles paper.similar request
+
+    Queries:
+        name (str): Name to look up.
+        limit (int): Maximum number of papers (default=10, max=50)
+        threshold (float): Minimum similarity from 0 to 1 (default=0.5)
+
+    Returns:
+        (dict, int): Papers with similar name or citation title, best match first.
+
+    Raises:
+        BadRequest: If name is missing or threshold is out of range.
+        ServiceUnavailable: If pg_trgm extension is not installed.
+
+    """
+
+    name = request.args.get("name", "").strip()
+    if not name:
+        abort(400, description="Missing paper name.")
+
+    try:
+        threshold = float(request.args.get("threshold", SIMILAR_THRESHOLD))
+    except ValueError:
+        threshold = -1.0
+
+    if not 0 <= threshold <= 1:
+        abort(400, description="Threshold must be a number from 0 to 1.")
+
+    if not is_similarity_available():
+        abort(503, description="Similarity search is not available, pg_trgm extension is not installed.")
+
+    papers = find_similar([name], get_limit(SIMILAR_LIMIT, SIMILAR_MAX_LIMIT), threshold).get(name, [])
+    return {"count": len(papers), "results": papers}, 200
+
+
 if __name__ == "__main__":
     ...
@@ -4,30 +4,62 @@ Provides operational functions to the users blueprint.
 """
 
 import functools
+import math
 from datetime import datetime
 from typing import Callable, Literal, Tuple
 
-import psycopg2
-import psycopg2.errors as pgerr
-from flask import request, session
+from flask import abort, g, request, session
+from sqlalchemy.exc import IntegrityError
 
 from ...models.users import User, db
 from ..CitenoteError import (
+    HashingBusyError,
     PasswordError,
     RoleError,
     UsernameError,
+    UsernameFoundError,
     UsernameInSession,
     UsernameNotInSession,
 )
+from ..logger import get_logger
 from .helper_main import (
-    bcolors,
     citenote_check_hash,
     citenote_gen_hash,
+    citenote_needs_rehash,
     get_citenote_data,
     get_form_data,
 )
 
 
+log = get_logger("users")
+
+
+def get_user(username: str) -> User | None:
+    """Returns user by username, loaded at most once per request
+
+    Users are cached in request context by username, lookups go through unique index on username.
+
+    Args:
+        username (str): Username of user
+
+    Returns:
+        (User | None): User object or None if username is not present in database.
+
+    """
+
+    users = g.setdefault("users", {})
+    if username not in users:
+        users[username] = User.query.filter_by(username=username).one_or_none()
+
+    return users[username]
+
+
+def forget_user(username: str) -> None:
+    """Drops user from request cache after it is deleted"""
+
+    g.get("users", {}).pop(username, None)
+
+
 def validate_fields(field: str) -> str:
     """Validate the query provided by the user.
 
@@ -95,6 +127,18 @@ def get_role() -> str:
     return role_validator(role)
 
 
+def abort_busy(err: HashingBusyError) -> None:
+    """Answers request with 503 when password hashing is busy
+
+    Raises:
+        ServiceUnavailable: Always, with Retry-After set to the hashing queue timeout.
+
+    """
+
+    err.print_error()
+    abort(503, description=err.message, retry_after=max(math.ceil(err.retry_after), 1))
+
+
 def users_operations(ufunc: Callable) -> Callable:
     """User operations handler for user routes
 
@@ -110,12 +154,20 @@ def users_operations(ufunc: Callable) -> Callable:
     Returns:
         wrapper (tuple): Returns output (dict -> json) and status code
 
+    Raises:
+        ServiceUnavailable: If password hashing is busy.
+
     """
 
     @functools.wraps(ufunc)
     def wrapper() -> Tuple[dict, int]:
         _check, name = ufunc()
-        if _check():
+        try:
+            successful = _check()
+        except HashingBusyError as err:
+            abort_busy(err)
+
+        if successful:
             return {"check": f"{name} successful"}, 200
         return {"check": f"{name} unsuccessful"}, 400
 
@@ -146,6 +198,7 @@ def users_login() -> bool:
         UsernameInSession: If user is already logged in.
         UsernameError: If username not found in database.
         PasswordError: If provided password does not match with password in database.
+        HashingBusyError: If password hashing is busy, raised to users_operations.
 
     """
 
@@ -159,33 +212,40 @@ def users_login() -> bool:
         username = validate_fields("username")
         password = validate_fields("password")
 
-        user: User = User.query.filter_by(username=username).first()
+        user = get_user(username)
         if not user:
             raise UsernameError
 
         if not citenote_check_hash(password, user.password):
             raise PasswordError
 
+        if citenote_needs_rehash(user.password):
+            # Old hash stays valid, rehash is tried again on next login
+            try:
+                user.password = citenote_gen_hash(password)
+                log.info("username = %r password rehashed", username)
+            except HashingBusyError as err:
+                log.warning("username = %r password not rehashed - Error: %s()", username, err.error)
+
         user.last_login = request_time
         db.session.commit()
 
         session["username"] = user.username
         session["role"] = user.role
-        print(f"{username = } logged in session\n{request_time}")
+        log.info("username = %r logged in session at %s", username, request_time)
 
     except (UsernameInSession, UsernameError, PasswordError) as err:
         errors += 1
         err.print_error()
 
-    except (Exception, psycopg2.Error) as err:
+    except Exception as err:
         errors += 1
-        bcolors.print_warning("Login failed", repr(err))
+        log.error("Login failed - Error: %r", err)
 
-    finally:
-        if errors:
-            return False
+    if errors:
+        return False
 
-        return True
+    return True
 
 
 def users_register() -> bool:
@@ -212,6 +272,8 @@ def users_register() -> bool:
     Raises:
         UsernameError: If username not found in database.
         PasswordError: If provided password does not match with password in database.
+        UsernameFoundError: If username already exists in database.
+        HashingBusyError: If password hashing is busy, raised to users_operations.
 
     """
 
@@ -223,33 +285,39 @@ def users_register() -> bool:
         password = validate_fields("password")
         role = get_role()
 
-        if User.query.filter_by(username=username).first():
-            raise pgerr.UniqueViolation
+        if get_user(username):
+            raise UsernameFoundError
 
         user = User(username, citenote_gen_hash(password), role)
         user.date_joined = request_time
         db.session.add(user)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Same username registered by concurrent request, rejected by unique index
+            db.session.rollback()
+            raise UsernameFoundError
+
+        g.users[username] = user
 
-        print(f"{username = } registered in database")
+        log.info("username = %r registered in database", username)
 
     except RoleError as err:
         errors += 1
         err.print_error()
 
-    except pgerr.UniqueViolation as err:
+    except UsernameFoundError as err:
         errors += 1
-        bcolors.print_warning("Username already exists", repr(err))
+        err.print_error()
 
-    except (Exception, psycopg2.Error) as err:
+    except Exception as err:
         errors += 1
-        bcolors.print_warning("Registration failed", repr(err))
+        log.error("Registration failed - Error: %r", err)
 
-    finally:
-        if errors:
-            return False
+    if errors:
+        return False
 
-        return True
+    return True
 
 
 def users_delete() -> bool:
@@ -274,6 +342,7 @@ def users_delete() -> bool:
     Raises:
         UsernameError: If username not found in database.
         PasswordError: If provided password does not match with password in database.
+        HashingBusyError: If password hashing is busy, raised to users_operations.
     """
 
     errors = 0
@@ -282,7 +351,7 @@ def users_delete() -> bool:
         username = validate_fields("username")
         password = validate_fields("password")
 
-        user = User.query.filter_by(username=username).first()
+        user = get_user(username)
 
         if not user:
             raise UsernameError
@@ -292,23 +361,23 @@ def users_delete() -> bool:
 
         db.session.delete(user)
         db.session.commit()
+        forget_user(username)
 
-        print(f"{username = } deleted from database")
+        log.info("username = %r deleted from database", username)
 
     except (PasswordError, UsernameError) as err:
         errors += 1
         err.print_error()
 
-    except (Exception, psycopg2.Error) as err:
+    except Exception as err:
         errors += 1
-        bcolors.print_warning("Removal failed", repr(err))
+        log.error("Removal failed - Error: %r", err)
 
-    finally:
-        if errors:
-            return False
+    if errors:
+        return False
 
-        session.clear()
-        return True
+    session.clear()
+    return True
 
 
 def users_logout() -> bool:
@@ -332,22 +401,21 @@ def users_logout() -> bool:
             raise UsernameNotInSession
 
         username = session["username"]
-        print(f"{username = } logged out from session")
+        log.info("username = %r logged out from session", username)
         session.clear()
 
     except UsernameNotInSession as err:
         errors += 1
         err.print_error()
 
-    except (Exception, psycopg2.Error) as err:
+    except Exception as err:
         errors += 1
-        bcolors.print_warning("Logout failed ", repr(err))
+        log.error("Logout failed - Error: %r", err)
 
-    finally:
-        if errors:
-            return False
+    if errors:
+        return False
 
-        return True
+    return True
 
 
 def get_user_by_username(username: str) -> User | Literal[False]:
@@ -368,26 +436,19 @@ def get_user_by_username(username: str) -> User | Literal[False]:
 
     """
     try:
-        user: User = User.query.filter_by(username=username).first()
-        print(
-            {
-                "id": user.id,
-                "name": user.username,
-                "role": user.role,
-            }
-        )
-
+        user = get_user(username)
         if not user:
             raise UsernameError
 
+        log.debug("id = %s, name = %s, role = %s", user.id, user.username, user.role)
         return user
 
     except UsernameError as err:
         err.print_error()
         return False
 
-    except (Exception, psycopg2.Error) as err:
-        bcolors.print_warning("Get user by username operation failed ", repr(err))
+    except Exception as err:
+        log.error("Get user by username operation failed - Error: %r", err)
         return False
 
 
@@ -406,13 +467,14 @@ def update_user_by_username(username: str) -> bool:
     Raise:
         UsernameError: Raises if username is not present in database
         PasswordError: Raises if password does not matches database password
+        ServiceUnavailable: Raises if password hashing is busy
 
     """
 
     _check = False
 
     try:
-        user: User = User.query.filter_by(username=username).first()
+        user = get_user(username)
         password = get_form_data("password")
         new_role = get_form_data("new_role", required=True)
         role_validator(new_role)
@@ -432,12 +494,14 @@ def update_user_by_username(username: str) -> bool:
         err.print_error()
         _check = False
 
-    except (Exception, psycopg2.Error) as err:
-        print("Get user by username operation failed ", err)
+    except HashingBusyError as err:
+        abort_busy(err)
+
+    except Exception as err:
+        log.error("Update user by username operation failed - Error: %r", err)
         _check = False
 
-    finally:
-        return _check
+    return _check
 
 
 if __name__ == "__main__":
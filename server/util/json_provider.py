@@ -0,0 +1,91 @@
+"""./server/util/json_provider
+
+JSON providers of the flask app.
+
+"json_provider" in config.json selects the provider set by set_config.configure:
+    "orjson" (default): OrjsonProvider, used when orjson is installed, otherwise flask provider is kept.
+    "default": Flask provider on top of stdlib json.
+
+OrjsonProvider writes response bodies as bytes in one call. Output matches flask provider: keys are sorted only if
+JSON_SORT_KEYS or sort_keys says so, compact unless in debug mode, dates are formatted by flask's default function.
+Unlike stdlib json, non ascii characters are written as UTF-8 instead of escapes.
+"""
+
+from typing import Any
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider, JSONProvider
+
+from .logger import get_logger
+from .registry import registry
+
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+log = get_logger("config")
+
+DEFAULT_PROVIDER = "orjson"
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider serializing with orjson"""
+
+    def get_option(self, indent: bool = False) -> int:
+        sort_keys = self._app.config.get("JSON_SORT_KEYS")
+        if sort_keys is None:
+            sort_keys = self.sort_keys
+
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+
+        return option
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """Serializes obj, arguments other than indent and separators are passed to stdlib json"""
+
+        indent = kwargs.pop("indent", None)
+        kwargs.pop("separators", None)
+        if kwargs:
+            return super().dumps(obj, indent=indent, **kwargs)
+
+        return orjson.dumps(obj, default=self.default, option=self.get_option(bool(indent))).decode()
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        option = self.get_option(indent) | orjson.OPT_APPEND_NEWLINE
+        return self._app.response_class(orjson.dumps(obj, default=self.default, option=option), mimetype=self.mimetype)
+
+
+def get_json_provider(app: Flask) -> JSONProvider:
+    """Returns JSON provider selected by "json_provider" of config.json
+
+    Args:
+        app (Flask): Flask application
+
+    """
+
+    name = registry.get("config").get("json_provider", DEFAULT_PROVIDER)
+
+    if name == "orjson":
+        if orjson is not None:
+            return OrjsonProvider(app)
+        log.info("orjson is not installed, using default JSON provider")
+
+    elif name != "default":
+        log.warning("Unknown JSON provider %r, using default JSON provider", name)
+
+    return DefaultJSONProvider(app)
@@ -1,19 +1,197 @@
+import atexit
+import json
 import logging
+import queue
+import time
 from logging.config import dictConfig
+from logging.handlers import QueueHandler, QueueListener
 
-import yaml
-from flask import request
+from flask import g, request
 
+from .registry import registry
 
-with open(r"server/logger.yaml") as fp:
-    custom_format = yaml.safe_load(fp)
+
+LOGGER_CONFIG = r"server/logger.yaml"
+
+access_logger = logging.getLogger("citenote.access")
+_listeners: list[QueueListener] = []
+
+
+class bcolors:
+    """Batch shell/Console Colors
+
+    Hold the text color values for batch shell/console.
+
+    Attributes:
+        WARNING (str): Red color for errors/major warnings.
+        SUCCESS (str): Green color for success.
+        MESSAGE (str): Yellow color for message/minor warnings.
+        RESET (str): White color for regular messages and reset colors.
+
+    """
+
+    WARNING = "\u001b[31m"
+    SUCCESS = "\u001b[32m"
+    MESSAGE = "\u001b[33m"
+    RESET = "\u001b[0m"
+
+    @staticmethod
+    def print_warning(message="", error=""):
+        """Print warning
+
+        Print red colored text for major warning and errors
+
+        Args:
+            message (str) = Message provided or ""
+            message (str) = Error provided or ""
+        """
+        print(f"{bcolors.WARNING}{message}\nError: {error}{bcolors.RESET}")
+
+    @staticmethod
+    def print_message(message="", status=""):
+        """Print message
+
+        Print yellow colored text for minor warning and status.
+
+        Args:
+            message (str) = Message provided or ""
+            status (str) = Status provided or ""
+        """
+        status_string = f"({status}) -> " if status else ""
+        print(f"{bcolors.MESSAGE}Status: {status_string}{message}{bcolors.RESET}")
+
+    @staticmethod
+    def print_success(message=""):
+        """Print sucess
+
+        Print green colored text. Used to print message for successfull operation.
+
+        Args:
+            message (str) = Message provided or ""
+        """
+        print(f"{bcolors.SUCCESS}{message}{bcolors.RESET}")
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Returns diagnostic logger for citenote component
+
+    Messages should be passed with %-style arguments, so formatting is skipped when the level is disabled.
+
+    Args:
+        name (str): Name of the component.
+
+    Returns:
+        (Logger): Child logger of "citenote" logger.
+
+    """
+
+    return logging.getLogger(f"citenote.{name}")
+
+
+class ColorFormatter(logging.Formatter):
+    """Colors log record with bcolors according to its level"""
+
+    LEVEL_COLORS = {
+        logging.DEBUG: bcolors.RESET,
+        logging.INFO: bcolors.SUCCESS,
+        logging.WARNING: bcolors.MESSAGE,
+        logging.ERROR: bcolors.WARNING,
+        logging.CRITICAL: bcolors.WARNING,
+    }
+
+    def format(self, record: logging.LogRecord) -> str:
+        color = self.LEVEL_COLORS.get(record.levelno, bcolors.RESET)
+        return f"{color}{super().format(record)}{bcolors.RESET}"
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formats log record as single line json object
+
+    Fields passed through ``extra={"fields": {...}}`` are merged into the object.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        payload.update(getattr(record, "fields", {}))
+        return json.dumps(payload)
+
+
+def queue_handlers(logger: logging.Logger) -> None:
+    """Moves handlers of logger behind a queue
+
+    Records are put on the queue by the calling thread and emitted by a background listener thread.
+
+    Args:
+        logger (Logger): Logger whose handlers are moved.
+
+    """
+
+    handlers = logger.handlers[:]
+    if not handlers:
+        return
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    logger.handlers = [QueueHandler(log_queue)]  # type: ignore[list-item]
+    listener.start()
+    _listeners.append(listener)
+
+
+def stop_logging() -> None:
+    """Flushes queued records and stops listener threads"""
+
+    while _listeners:
+        _listeners.pop().stop()
+
+
+def configure_logging(path: str = LOGGER_CONFIG) -> None:
+    """Configures logging for the application
+
+    Configuration is applied once per process, later calls are ignored. Level of diagnostic loggers can be
+    overridden with "log_level" field of config.json.
+
+    Args:
+        path (str): Path of yaml logging configuration.
+
+    """
+
+    if _listeners:
+        return
+
+    import yaml
+
+    with open(path) as fp:
+        dictConfig(yaml.safe_load(fp))
+
+    diagnostics = logging.getLogger("citenote")
+    try:
+        level = registry.get("config").get("log_level")
+    except FileNotFoundError:
+        level = None
+
+    if level:
+        diagnostics.setLevel(str(level).upper())
+
+    queue_handlers(logging.getLogger())
+    queue_handlers(diagnostics)
+    queue_handlers(access_logger)
+    atexit.register(stop_logging)
+
+
+def start_timer() -> None:
+    """Stores request start time"""
+    g.request_start = time.perf_counter()
 
 
 def get_request_string(status):
     return "{0} - {1}:{2} {3} {4}?{5} {6} -".format(
         status,
         request.environ["REMOTE_ADDR"],
-        request.environ["REMOTE_PORT"],
+        request.environ.get("REMOTE_PORT", "-"),
         request.environ["REQUEST_METHOD"],
         request.environ["PATH_INFO"],
         request.environ["QUERY_STRING"],
@@ -21,11 +199,47 @@ def get_request_string(status):
     )
 
 
+def log_access(remote_addr: str | None, method: str, path: str, query: str, status: int, start: float | None) -> None:
+    """Writes access log record
+
+    Args:
+        start (float): time.perf_counter() at start of the request or None if unknown.
+
+    """
+
+    if not access_logger.isEnabledFor(logging.INFO):
+        return
+
+    elapsed = (time.perf_counter() - start) * 1000 if start else None
+    access_logger.info(
+        "access",
+        extra={
+            "fields": {
+                "remote_addr": remote_addr,
+                "method": method,
+                "path": path,
+                "query": query,
+                "status": status,
+                "elapsed_ms": round(elapsed, 3) if elapsed is not None else None,
+            }
+        },
+    )
+
+
 def logger_citenote(response):
-    dictConfig(custom_format)
     status = response.status_code
 
-    if 300 <= status < 400:
+    log_access(
+        request.remote_addr,
+        request.method,
+        request.path,
+        request.query_string.decode("latin-1"),
+        status,
+        g.get("request_start"),
+    )
+
+    # 304 answers a revalidation of cached response, it is not a redirect
+    if 300 <= status < 400 and status != 304:
         logging.warning(get_request_string(status))
 
     if 400 <= status:
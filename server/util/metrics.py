@@ -0,0 +1,240 @@
+"""./server/util/metrics
+
+Request metrics in Prometheus text format, served at /metrics.
+
+Every thread counts its own requests in a ThreadStats shard, so recording a request takes no lock. Shards are summed
+when metrics are collected, shards of finished threads (e.g. thread per request of werkzeug server) are folded into
+one retired shard then and when new threads register.
+
+Exposed metrics:
+    citenote_requests_total: Requests by blueprint, route, method and status.
+    citenote_request_duration_seconds: Latency histogram by blueprint, route and method.
+    citenote_requests_in_flight: Requests being handled.
+    citenote_db_pool_*: Connection pool gauges of every engine.
+    citenote_cache_*: Response cache counters, hit ratio and entries.
+"""
+
+import bisect
+import collections
+import threading
+import time
+
+from flask import g, request
+
+from .cache import response_cache
+from .db import get_pool_status
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FOLD_INTERVAL = 64
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+POOL_GAUGES = {
+    "size": "Configured pool size.",
+    "checked_in": "Idle connections in pool.",
+    "checked_out": "Connections in use.",
+    "overflow": "Connections over pool size, negative while pool is not full.",
+}
+
+
+class ThreadStats:
+    """Counters of one thread
+
+    Attributes:
+        thread (Thread): Owner of the shard, None for retired shard.
+        started (int): Requests started.
+        finished (int): Requests finished.
+        requests (Counter): Requests by (blueprint, route, method, status).
+        durations (dict): Bucket counts followed by sum of durations by (blueprint, route, method).
+
+    """
+
+    __slots__ = ("thread", "started", "finished", "requests", "durations")
+
+    def __init__(self, thread: threading.Thread | None) -> None:
+        self.thread = thread
+        self.started = 0
+        self.finished = 0
+        self.requests: collections.Counter = collections.Counter()
+        self.durations: dict[tuple, list] = {}
+
+    def merge(self, other: "ThreadStats") -> None:
+        """Adds counters of other shard"""
+
+        self.started += other.started
+        self.finished += other.finished
+        self.requests.update(dict(other.requests))
+        for labels, histogram in dict(other.durations).items():
+            own = self.durations.get(labels)
+            if own is None:
+                self.durations[labels] = list(histogram)
+            else:
+                self.durations[labels] = [a + b for a, b in zip(own, histogram)]
+
+
+class RequestMetrics:
+    """Request counters and latency histograms, sharded per thread
+
+    Attributes:
+        buckets (tuple): Upper bounds of histogram buckets in seconds.
+
+    """
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self._local = threading.local()
+        self._shards: list[ThreadStats] = []
+        self._retired = ThreadStats(None)
+        self._registered = 0
+        self._lock = threading.Lock()
+
+    def shard(self) -> ThreadStats:
+        """Returns shard of current thread"""
+
+        stats = getattr(self._local, "stats", None)
+        if stats is None:
+            stats = self._local.stats = ThreadStats(threading.current_thread())
+            with self._lock:
+                self._shards.append(stats)
+                self._registered += 1
+                if self._registered % FOLD_INTERVAL == 0:
+                    self._fold()
+
+        return stats
+
+    def _fold(self) -> None:
+        """Merges shards of finished threads into retired shard, lock must be held"""
+
+        alive = []
+        for stats in self._shards:
+            if stats.thread.is_alive():
+                alive.append(stats)
+            else:
+                self._retired.merge(stats)
+        self._shards = alive
+
+    def start(self) -> None:
+        self.shard().started += 1
+
+    def record(self, blueprint: str, route: str, method: str, status: int, duration: float) -> None:
+        """Counts finished request"""
+
+        stats = self.shard()
+        stats.finished += 1
+        stats.requests[(blueprint, route, method, status)] += 1
+
+        labels = (blueprint, route, method)
+        histogram = stats.durations.get(labels)
+        if histogram is None:
+            histogram = stats.durations[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        histogram[bisect.bisect_left(self.buckets, duration)] += 1
+        histogram[-1] += duration
+
+    def collect(self) -> ThreadStats:
+        """Returns sum of all shards"""
+
+        with self._lock:
+            self._fold()
+            shards = [self._retired, *self._shards]
+
+        total = ThreadStats(None)
+        for stats in shards:
+            total.merge(stats)
+        return total
+
+
+request_metrics = RequestMetrics()
+
+
+def start_request() -> None:
+    """Counts request as in flight, registered as before_request"""
+
+    g.metrics_start = time.perf_counter()
+    request_metrics.start()
+
+
+def record_request(response):
+    """Records route, status and latency of request, registered as after_request"""
+
+    start = g.get("metrics_start")
+    if start is not None:
+        rule = request.url_rule
+        request_metrics.record(
+            request.blueprint or "",
+            rule.rule if rule is not None else "unmatched",
+            request.method,
+            response.status_code,
+            time.perf_counter() - start,
+        )
+
+    return response
+
+
+def escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(**labels) -> str:
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def format_number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_metrics() -> str:
+    """Returns all metrics in Prometheus text format
+
+    Must be called inside application context.
+
+    """
+
+    stats = request_metrics.collect()
+    lines = []
+
+    def header(name: str, kind: str, help: str) -> None:
+        lines.append(f"# HELP {name} {help}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    header("citenote_requests_total", "counter", "Requests by route and status.")
+    for (blueprint, route, method, status), count in sorted(stats.requests.items()):
+        labels = format_labels(blueprint=blueprint, route=route, method=method, status=status)
+        lines.append(f"citenote_requests_total{labels} {count}")
+
+    name = "citenote_request_duration_seconds"
+    header(name, "histogram", "Request latency by route.")
+    bounds = [format_number(bound) for bound in request_metrics.buckets] + ["+Inf"]
+    for (blueprint, route, method), histogram in sorted(stats.durations.items()):
+        cumulative = 0
+        for bound, count in zip(bounds, histogram):
+            cumulative += count
+            labels = format_labels(blueprint=blueprint, route=route, method=method, le=bound)
+            lines.append(f"{name}_bucket{labels} {cumulative}")
+        labels = format_labels(blueprint=blueprint, route=route, method=method)
+        lines.append(f"{name}_sum{labels} {format_number(histogram[-1])}")
+        lines.append(f"{name}_count{labels} {cumulative}")
+
+    header("citenote_requests_in_flight", "gauge", "Requests being handled.")
+    lines.append(f"citenote_requests_in_flight {stats.started - stats.finished}")
+
+    pools = get_pool_status()
+    for field, help in POOL_GAUGES.items():
+        header(f"citenote_db_pool_{field}", "gauge", help)
+        for bind, status in pools.items():
+            if status[field] is not None:
+                lines.append(f"citenote_db_pool_{field}{format_labels(bind=bind)} {status[field]}")
+
+    cache_stats = dict(response_cache.stats)
+    header("citenote_cache_requests_total", "counter", "Response cache lookups and events by state.")
+    for state, count in sorted(cache_stats.items()):
+        lines.append(f"citenote_cache_requests_total{format_labels(state=state)} {count}")
+
+    hits = cache_stats.get("hit", 0) + cache_stats.get("stale", 0)
+    lookups = hits + cache_stats.get("miss", 0)
+    header("citenote_cache_hit_ratio", "gauge", "Share of cache lookups served from cache, stale included.")
+    lines.append(f"citenote_cache_hit_ratio {format_number(hits / lookups if lookups else 0.0)}")
+
+    header("citenote_cache_entries", "gauge", "Responses stored in cache.")
+    lines.append(f"citenote_cache_entries {len(response_cache)}")
+
+    return "\n".join(lines) + "\n"
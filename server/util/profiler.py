@@ -0,0 +1,197 @@
+"""./server/util/profiler
+
+On-demand request profiling.
+
+A request runs under cProfile when its ``X-Profile`` header equals ``profile_token`` or when it is picked by
+``profile_sample_rate``. Profiles are written to the profiles folder inside the instance folder as .prof files (read
+them with ``python -m pstats`` or snakeviz). The newest ``profile_keep`` profiles are kept and listed in
+profiles/index.json, and the response of a profiled request names its file in the ``X-Profile-Id`` header.
+
+Only one request is profiled at a time, requests arriving meanwhile run normally. While neither token nor sample
+rate is set, the hooks only check one flag.
+
+Settings from config.json:
+    profile_token (str): Header value enabling profiling (default=None, header is ignored)
+    profile_sample_rate (float): Share of requests profiled (default=0)
+    profile_keep (int): Number of profiles kept (default=100)
+"""
+
+import json
+import os
+import random
+import re
+import secrets
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import NamedTuple
+
+from flask import g, request
+
+from .logger import get_logger
+from .registry import registry
+from .set_config import make_instance_folder
+
+
+log = get_logger("profiler")
+
+PROFILE_HEADER = "X-Profile"
+PROFILES_FOLDER = "profiles"
+INDEX_FILE = "index.json"
+DEFAULT_KEEP = 100
+
+
+class ProfileSettings(NamedTuple):
+    token: str | None = None
+    sample_rate: float = 0.0
+    keep: int = DEFAULT_KEEP
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.token) or self.sample_rate > 0
+
+
+settings = ProfileSettings()
+_lock = threading.Lock()
+
+
+def load_profile_settings(*_) -> None:
+    """Reads profiling settings from config.json, registered as registry listener"""
+
+    global settings
+
+    config = registry.get("config")
+    settings = ProfileSettings(
+        config.get("profile_token") or None,
+        float(config.get("profile_sample_rate", 0.0)),
+        int(config.get("profile_keep", DEFAULT_KEEP)),
+    )
+
+
+def get_reason() -> str | None:
+    """Returns why current request is profiled or None if it is not"""
+
+    header = request.headers.get(PROFILE_HEADER)
+    if header and settings.token and secrets.compare_digest(header, settings.token):
+        return "header"
+
+    if settings.sample_rate and random.random() < settings.sample_rate:  # nosec
+        return "sample"
+
+    return None
+
+
+def get_profiles_folder() -> Path:
+    """Returns profiles folder, creates it if missing"""
+
+    folder = make_instance_folder().joinpath(PROFILES_FOLDER)
+    folder.mkdir(exist_ok=True)
+    return folder
+
+
+def load_index(path: Path) -> list[dict]:
+    try:
+        with path.open(encoding="utf-8") as index_file:
+            return json.load(index_file)
+    except (OSError, ValueError):
+        return []
+
+
+def write_index(path: Path, index: list[dict]) -> None:
+    """Replaces index file at once, so readers never see partial file"""
+
+    temporary = path.with_suffix(".tmp")
+    with temporary.open("w", encoding="utf-8") as index_file:
+        json.dump(index, index_file, indent=2)
+    os.replace(temporary, path)
+
+
+def save_profile(profile, reason: str, status: int, elapsed: float) -> str:
+    """Writes profile of current request and adds it to index
+
+    Profiles beyond the newest profile_keep are deleted.
+
+    Args:
+        profile (cProfile.Profile): Stopped profiler of the request.
+        reason (str): Why request was profiled, "header" or "sample".
+        status (int): Status code of response.
+        elapsed (float): Seconds spent in request.
+
+    Returns:
+        (str): File name of profile.
+
+    """
+
+    folder = get_profiles_folder()
+    created = datetime.now(timezone.utc)
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", request.path).strip("_")[:60] or "root"
+    name = f"{created:%Y%m%dT%H%M%S%fZ}_{request.method}_{slug}.prof"
+    profile.dump_stats(str(folder.joinpath(name)))
+
+    index_path = folder.joinpath(INDEX_FILE)
+    index = [
+        {
+            "file": name,
+            "created": created.isoformat(),
+            "method": request.method,
+            "path": request.path,
+            "query": request.query_string.decode("latin-1"),
+            "status": status,
+            "elapsed_ms": round(elapsed * 1000, 3),
+            "reason": reason,
+        },
+        *load_index(index_path),
+    ]
+
+    for entry in index[settings.keep:]:
+        folder.joinpath(entry["file"]).unlink(missing_ok=True)
+
+    write_index(index_path, index[: settings.keep])
+    return name
+
+
+def start_profile() -> None:
+    """Starts profiler if request is profiled, registered as before_request"""
+
+    if not settings.enabled:
+        return
+
+    reason = get_reason()
+    if reason is None or not _lock.acquire(blocking=False):
+        return
+
+    # Imported on first profiled request, so the app does not load profiler modules while profiling is off
+    import cProfile
+
+    profile = cProfile.Profile()
+    g.profile = (profile, reason, time.perf_counter())
+    profile.enable()
+
+
+def finish_profile(response):
+    """Stops profiler and saves profile, registered as after_request"""
+
+    if "profile" not in g:
+        return response
+
+    profile, reason, start = g.pop("profile")
+    profile.disable()
+    elapsed = time.perf_counter() - start
+    try:
+        response.headers["X-Profile-Id"] = save_profile(profile, reason, response.status_code, elapsed)
+    except OSError as err:
+        log.warning("Saving profile of %s failed - Error: %r", request.path, err)
+    finally:
+        _lock.release()
+
+    return response
+
+
+def stop_profile(_) -> None:
+    """Stops profiler if after_request did not run, registered as teardown_request"""
+
+    entry = g.pop("profile", None)
+    if entry is not None:
+        entry[0].disable()
+        _lock.release()
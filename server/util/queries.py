@@ -0,0 +1,175 @@
+"""./server/util/queries
+
+SQL query instrumentation.
+
+Cursor events of every engine count statements and database time of the current request in a QueryStats object.
+Statements slower than ``slow_query_ms`` are logged with their parameters. At the end of a request, statements run
+``n_plus_one_threshold`` or more times are logged as likely N+1 patterns, and in debug mode the response gets
+``X-Query-Count`` and ``X-Query-Time`` (milliseconds) headers.
+
+Both settings are read from config.json, 0 disables the check:
+    slow_query_ms (float): Threshold of slow statement log (default=200)
+    n_plus_one_threshold (int): Executions of one statement flagged in a request (default=5)
+
+Query counts of any block, including requests made with the test client, are taken with count_queries:
+
+    with count_queries() as stats:
+        client.get("/manuscripts/")
+    assert stats.count <= 2
+"""
+
+import collections
+import contextlib
+import contextvars
+import time
+from typing import Iterator, NamedTuple
+
+from flask import current_app, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .logger import get_logger
+from .registry import registry
+
+
+log = get_logger("queries")
+
+DEFAULT_SLOW_QUERY_MS = 200.0
+DEFAULT_N_PLUS_ONE_THRESHOLD = 5
+MAX_PARAMETERS_LENGTH = 500
+
+
+class QuerySettings(NamedTuple):
+    slow_query_ms: float = DEFAULT_SLOW_QUERY_MS
+    n_plus_one_threshold: int = DEFAULT_N_PLUS_ONE_THRESHOLD
+
+
+settings = QuerySettings()
+
+
+class QueryStats:
+    """Statements executed in a request or block
+
+    Statements are recorded in enclosing stats too, so counts of a block include requests made inside it.
+
+    Attributes:
+        count (int): Number of executed statements.
+        time (float): Seconds spent in the database.
+        statements (Counter): Executions by statement text.
+        parent (QueryStats): Enclosing stats or None.
+
+    """
+
+    __slots__ = ("count", "time", "statements", "parent")
+
+    def __init__(self, parent: "QueryStats | None" = None) -> None:
+        self.count = 0
+        self.time = 0.0
+        self.statements: collections.Counter = collections.Counter()
+        self.parent = parent
+
+    def record(self, statement: str, elapsed: float) -> None:
+        stats: QueryStats | None = self
+        while stats is not None:
+            stats.count += 1
+            stats.time += elapsed
+            stats.statements[statement] += 1
+            stats = stats.parent
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Returns statements executed at least threshold times, most frequent first"""
+
+        if threshold <= 0:
+            return []
+
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+
+_current: contextvars.ContextVar[QueryStats | None] = contextvars.ContextVar("citenote_query_stats", default=None)
+
+
+def load_query_settings(*_) -> None:
+    """Reads thresholds from config.json, registered as registry listener"""
+
+    global settings
+
+    config = registry.get("config")
+    settings = QuerySettings(
+        float(config.get("slow_query_ms", DEFAULT_SLOW_QUERY_MS)),
+        int(config.get("n_plus_one_threshold", DEFAULT_N_PLUS_ONE_THRESHOLD)),
+    )
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+    if settings.slow_query_ms and elapsed * 1000 >= settings.slow_query_ms:
+        log.warning(
+            "Slow query %.1f ms: %s - Parameters: %.*r",
+            elapsed * 1000,
+            statement,
+            MAX_PARAMETERS_LENGTH,
+            parameters,
+        )
+
+
+def listen_queries() -> None:
+    """Registers cursor events on all engines and loads settings"""
+
+    load_query_settings()
+    if not event.contains(Engine, "before_cursor_execute", before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", after_cursor_execute)
+
+
+@contextlib.contextmanager
+def count_queries() -> Iterator[QueryStats]:
+    """Counts statements executed inside the block"""
+
+    token = _current.set(QueryStats(_current.get()))
+    try:
+        yield _current.get()  # type: ignore[misc]
+    finally:
+        _current.reset(token)
+
+
+def start_queries() -> None:
+    """Starts counting statements of request, registered as before_request"""
+
+    g.query_stats_token = _current.set(QueryStats(_current.get()))
+
+
+def finish_queries(response):
+    """Reports statements of request, registered as after_request"""
+
+    token = g.pop("query_stats_token", None)
+    if token is None:
+        return response
+
+    stats = _current.get()
+    _current.reset(token)
+
+    for statement, count in stats.repeated(settings.n_plus_one_threshold):
+        log.warning("Possible N+1 in %s %s, %d executions of: %s", request.method, request.path, count, statement)
+
+    if current_app.debug:
+        response.headers["X-Query-Count"] = str(stats.count)
+        response.headers["X-Query-Time"] = f"{stats.time * 1000:.3f}"
+
+    return response
+
+
+def reset_queries(_) -> None:
+    """Stops counting if after_request did not run, registered as teardown_request"""
+
+    token = g.pop("query_stats_token", None)
+    if token is not None:
+        _current.reset(token)
@@ -0,0 +1,223 @@
+"""./server/util/registry
+
+This module holds the process wide configuration registry for the flask application.
+
+Configuration files are parsed once and kept as an immutable snapshot. The files are checked for modification at most
+once per ``check_interval`` seconds and only the changed files are parsed again. Sending ``SIGHUP`` to the process
+forces a reload on the next access.
+"""
+
+import configparser
+import json
+import os
+import pickle
+import signal
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Callable, Mapping, NamedTuple
+
+
+def load_json(path: str) -> Mapping:
+    """Loads json file as read only mapping"""
+    with open(path) as json_file:
+        return MappingProxyType(json.load(json_file))
+
+
+def load_metadata(path: str) -> Mapping:
+    """Loads metadata section of setup.cfg as read only mapping"""
+    parser = configparser.ConfigParser()
+    parser.read(path)
+    return MappingProxyType(dict(parser.items("metadata")))
+
+
+def load_text(path: str) -> str:
+    """Loads text file"""
+    with open(path, "r") as text_file:
+        return text_file.read()
+
+
+def load_yaml(path: str) -> Mapping:
+    """Loads yaml file as read only mapping"""
+    import yaml
+
+    with open(path, "r") as yaml_file:
+        return MappingProxyType(yaml.safe_load(yaml_file))
+
+
+def load_pickle(path: str) -> Mapping:
+    """Loads pickled citenote data as read only mapping"""
+    with open(path, "rb") as data_file:
+        return MappingProxyType(pickle.load(data_file))
+
+
+class ConfigSnapshot(NamedTuple):
+    """Immutable view of all configuration files
+
+    Attributes:
+        config (Mapping): Values of config.json
+        metadata (Mapping): Values of [metadata] section of setup.cfg
+        version (str): Content of VERSION file
+        citenote_data (Mapping): Values of server/.citenote
+        papers (Mapping): Citation types of papers.yaml
+
+    """
+
+    config: Mapping | None = None
+    metadata: Mapping | None = None
+    version: str | None = None
+    citenote_data: Mapping | None = None
+    papers: Mapping | None = None
+
+
+class ConfigRegistry:
+    """Process wide cache of configuration files
+
+    Attributes:
+        check_interval (float): Minimum seconds between two modification checks.
+        sources (dict): Maps snapshot field to (path, loader).
+
+    """
+
+    def __init__(self, check_interval: float = 1.0) -> None:
+        self.check_interval = check_interval
+        self.sources: dict[str, tuple[str, Callable[[str], Any]]] = {
+            "config": ("config.json", load_json),
+            "metadata": ("setup.cfg", load_metadata),
+            "version": ("VERSION", load_text),
+            "citenote_data": ("server/.citenote", load_pickle),
+            "papers": ("papers.yaml", load_yaml),
+        }
+        self._lock = threading.Lock()
+        self._snapshot: ConfigSnapshot | None = None
+        self._mtimes: dict[str, int | None] = {}
+        self._checked_at = 0.0
+        self._reload_requested = False
+        self._listeners: list[Callable[[ConfigSnapshot], None]] = []
+
+    def configure(self, **paths: str) -> None:
+        """Overrides source paths and forces reload
+
+        Args:
+            **paths (str): Snapshot field name and new path of the file.
+
+        Raises:
+            KeyError: If unknown field is provided.
+
+        """
+
+        for name, path in paths.items():
+            _, loader = self.sources[name]
+            self.sources[name] = (path, loader)
+
+        self.reload()
+
+    def reload(self) -> None:
+        """Requests reload of all files on next access
+
+        Safe to call from signal handlers, as it only sets a flag.
+        """
+
+        self._reload_requested = True
+
+    def add_listener(self, listener: Callable[[ConfigSnapshot], None]) -> None:
+        """Registers callback to be called with new snapshot after reload"""
+
+        self._listeners.append(listener)
+
+    def install_signal_handler(self, signum: int | None = getattr(signal, "SIGHUP", None)) -> bool:
+        """Reloads configuration on signal
+
+        Args:
+            signum (int): Signal number (default=SIGHUP)
+
+        Returns:
+            (bool): True if handler is installed. Handlers can only be installed from the main thread.
+
+        """
+
+        if signum is None:
+            return False
+
+        try:
+            signal.signal(signum, lambda *_: self.reload())
+        except ValueError:
+            return False
+
+        return True
+
+    @property
+    def snapshot(self) -> ConfigSnapshot:
+        """Returns current snapshot, reloading changed files if check interval is over"""
+
+        snapshot = self._snapshot
+        if (
+            snapshot is None
+            or self._reload_requested
+            or time.monotonic() - self._checked_at >= self.check_interval
+        ):
+            snapshot = self.load()
+
+        return snapshot
+
+    def get(self, name: str) -> Any:
+        """Returns single value of snapshot
+
+        Args:
+            name (str): Name of snapshot field
+
+        Raises:
+            FileNotFoundError: If file for the field does not exist.
+
+        """
+
+        value = getattr(self.snapshot, name)
+        if value is None:
+            raise FileNotFoundError(self.sources[name][0])
+
+        return value
+
+    def load(self) -> ConfigSnapshot:
+        """Loads files which are modified since last load
+
+        Returns:
+            snapshot (ConfigSnapshot): Current snapshot
+
+        """
+
+        with self._lock:
+            forced = self._reload_requested or self._snapshot is None
+            self._reload_requested = False
+            self._checked_at = time.monotonic()
+
+            mtimes = {name: self._mtime(path) for name, (path, _) in self.sources.items()}
+            if not forced and mtimes == self._mtimes:
+                return self._snapshot  # type: ignore[return-value]
+
+            current = self._snapshot or ConfigSnapshot()
+            values = {}
+            for name, (path, loader) in self.sources.items():
+                if not forced and mtimes[name] == self._mtimes.get(name):
+                    values[name] = getattr(current, name)
+                elif mtimes[name] is None:
+                    values[name] = None
+                else:
+                    values[name] = loader(path)
+
+            self._mtimes = mtimes
+            self._snapshot = snapshot = ConfigSnapshot(**values)
+
+        for listener in self._listeners:
+            listener(snapshot)
+
+        return snapshot
+
+    @staticmethod
+    def _mtime(path: str) -> int | None:
+        try:
+            return os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+
+registry = ConfigRegistry()
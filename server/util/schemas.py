@@ -0,0 +1,133 @@
+"""./server/util/schemas
+
+Citation type schemas compiled from papers.yaml.
+
+papers.yaml is read through the configuration registry and compiled into one CitationSchema per type. Schemas are
+compiled again only when the registry loads a new version of the file.
+"""
+
+from types import MappingProxyType
+from typing import Any, Mapping
+
+from ..models.data_models import Citation
+from .CitenoteError import MissingFieldsError, UnknownCitationTypeError
+from .registry import registry
+
+
+# Columns of citation filled from citation fields
+CITATION_COLUMNS = tuple(column.name for column in Citation.__table__.columns if column.name not in ("id", "paper_id"))
+
+# Fields stored under another column, None for fields without column ("type" of thesis clashes with citation type)
+FIELD_COLUMNS = {"type": None}
+
+
+class CitationSchema:
+    """Required and optional fields of one citation type
+
+    Attributes:
+        type (str): Citation type, e.g. "article".
+        required (frozenset): Required fields.
+        optional (frozenset): Optional fields.
+        fields (tuple): All fields, required first, in papers.yaml order.
+        columns (Mapping): Fields mapped to their citation columns, fields without column are left out.
+
+    """
+
+    __slots__ = ("type", "required", "optional", "fields", "columns")
+
+    def __init__(self, citation_type: str, required: list | None, optional: list | None) -> None:
+        required = list(required or ())
+        optional = [field for field in optional or () if field not in required]
+
+        self.type = citation_type
+        self.required = frozenset(required)
+        self.optional = frozenset(optional)
+        self.fields = tuple(dict.fromkeys((*required, *optional)))
+        self.columns = MappingProxyType(
+            {
+                field: column
+                for field in self.fields
+                if (column := FIELD_COLUMNS.get(field, field)) in CITATION_COLUMNS
+            }
+        )
+
+    def __repr__(self) -> str:
+        return f"CitationSchema({self.type!r})"
+
+    def validate(self, data: Mapping) -> dict:
+        """Validates payload in one pass over fields of the type
+
+        Fields not in schema are ignored and empty values are treated as missing.
+
+        Args:
+            data (Mapping): Field values, e.g. request.form or fields of BibTeX entry.
+
+        Returns:
+            (dict): Non empty values by citation column.
+
+        Raises:
+            MissingFieldsError: If required fields are missing.
+
+        """
+
+        values = {}
+        missing = []
+        for field in self.fields:
+            value = data.get(field)
+            if value:
+                column = self.columns.get(field)
+                if column:
+                    values[column] = value
+            elif field in self.required:
+                missing.append(field)
+
+        if missing:
+            raise MissingFieldsError(self.type, missing)
+
+        return values
+
+
+def compile_schemas(source: Mapping) -> Mapping[str, CitationSchema]:
+    """Compiles citation types of papers.yaml"""
+
+    return MappingProxyType(
+        {
+            citation_type: CitationSchema(citation_type, fields.get("required"), fields.get("optional"))
+            for citation_type, fields in source.items()
+        }
+    )
+
+
+_compiled: tuple[Any, Mapping[str, CitationSchema]] | None = None
+
+
+def get_schemas() -> Mapping[str, CitationSchema]:
+    """Returns compiled schemas of current papers.yaml
+
+    Raises:
+        FileNotFoundError: If papers.yaml does not exist.
+
+    """
+
+    global _compiled
+
+    source = registry.get("papers")
+    compiled = _compiled
+    if compiled is None or compiled[0] is not source:
+        compiled = _compiled = (source, compile_schemas(source))
+
+    return compiled[1]
+
+
+def get_schema(citation_type: str) -> CitationSchema:
+    """Returns schema of citation type, type is case insensitive
+
+    Raises:
+        UnknownCitationTypeError: If type is not defined in papers.yaml.
+
+    """
+
+    try:
+        return get_schemas()[citation_type.lower()]
+    except KeyError:
+        raise UnknownCitationTypeError(citation_type) from None
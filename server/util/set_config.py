@@ -9,49 +9,90 @@ from pathlib import Path
 from flask import current_app
 
 from .db import get_uri
+from .logger import get_logger
+from .registry import registry
 
 
-def configure():
-    """Make configuration for the flask app"""
+log = get_logger("config")
 
-    _instance_folder = Path(current_app.root_path).joinpath("instance")
-    _config_file = Path(_instance_folder).joinpath("config.py")
 
-    # To maintain order of return message
-    current_app.config["JSON_SORT_KEYS"] = False
+def get_token():
+    """Generates token for the flask app"""
+    return secrets.token_hex(32)
+
+
+def get_instance_folder() -> Path:
+    """Returns instance folder of the flask app"""
+    return Path(current_app.root_path).joinpath("instance")
+
+
+def get_config_file() -> Path:
+    """Returns path of instance configuration file"""
+    return get_instance_folder().joinpath("config.py")
+
+
+def make_instance_folder() -> Path:
+    """Creates instance folder for flask app
+
+    Returns:
+        _instance_folder (Path): Path of instance folder.
+
+    """
+
+    _instance_folder = get_instance_folder()
+    if not Path.is_dir(_instance_folder):
+        log.info("Creating instance folder")
+        Path.mkdir(_instance_folder)
 
-    def get_token():
-        """Generates token for the flask app"""
-        return secrets.token_hex(32)
+    return _instance_folder
 
-    def make_instance_folder():
-        """Creates instance folder for flask app"""
-        if not Path.is_dir(_instance_folder):
-            print("Creating instance folder")
-            Path.mkdir(_instance_folder)
 
-    def write_config():
-        """Write configuration lines"""
+def write_config(_config_file: Path):
+    """Write configuration lines"""
 
-        with _config_file.open(mode="w", encoding="utf-8") as file:
-            file.write(f'SECRET_KEY = "{get_token()}"\n')
+    with _config_file.open(mode="w", encoding="utf-8") as file:
+        file.write(f'SECRET_KEY = "{get_token()}"\n')
 
-    def make_config_file(update=False):
-        """Creates and updates configuration files for flask app"""
 
-        if not Path.is_file(_config_file) or update:
-            write_config()
-            if not update:
-                print("Writing config file")
-            else:
-                print("Updating config file")
+def make_config_file(update=False) -> Path:
+    """Creates and updates configuration files for flask app
 
-    def __main__():
-        """Calls functions to generate instance folder and config file."""
+    Returns:
+        _config_file (Path): Path of configuration file.
 
+    """
+
+    _config_file = get_config_file()
+    if not Path.is_file(_config_file) or update:
         make_instance_folder()
-        make_config_file()
-        current_app.config.from_pyfile(str(_config_file), silent=True)
-        current_app.config["SQLALCHEMY_DATABASE_URI"] = get_uri()
+        write_config(_config_file)
+        if not update:
+            log.info("Writing config file")
+        else:
+            log.info("Updating config file")
+
+    return _config_file
+
+
+def configure():
+    """Make configuration for the flask app
+
+    Secret key is read from "secret_key" field of config.json when present, so the instance folder is not touched
+    during start up. Otherwise it is loaded from instance configuration file, which is created on first run. JSON
+    provider is selected by "json_provider" field (see json_provider.py).
+    """
+
+    # Imported here, so importing the package does not load orjson
+    from .json_provider import get_json_provider
+
+    # To maintain order of return message
+    current_app.config["JSON_SORT_KEYS"] = False
+    current_app.json = get_json_provider(current_app._get_current_object())
+
+    secret_key = registry.get("config").get("secret_key")
+    if secret_key:
+        current_app.config["SECRET_KEY"] = secret_key
+    else:
+        current_app.config.from_pyfile(str(make_config_file()), silent=True)
 
-    __main__()
+    current_app.config["SQLALCHEMY_DATABASE_URI"] = get_uri()
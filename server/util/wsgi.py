@@ -0,0 +1,63 @@
+"""./server/util/wsgi
+
+WSGI to ASGI adapter running the flask application in a bounded thread pool.
+
+asgiref's WsgiToAsgi runs the application through thread sensitive sync_to_async, so every request of the process is
+handled in one shared thread and requests never overlap. PooledWsgiToAsgi runs the same WSGI glue in its own thread
+pool, so up to ``threads`` requests are handled at once and further requests wait for a free thread.
+
+Settings are read from config.json when the ASGI application is created:
+    asgi_threads (int): Threads handling flask requests (default=40)
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import SyncToAsync
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+
+from .registry import registry
+
+
+DEFAULT_THREADS = 40
+
+# Undecorated run_wsgi_app of asgiref, its decorator pins it to the single thread
+_run_wsgi_app = WsgiToAsgiInstance.__dict__["run_wsgi_app"].func
+
+
+def get_threads() -> int:
+    """Returns number of threads handling flask requests from config.json"""
+
+    return int(registry.get("config").get("asgi_threads", DEFAULT_THREADS))
+
+
+class PooledWsgiInstance(WsgiToAsgiInstance):
+    """Request of PooledWsgiToAsgi, runs the application in thread of the executor"""
+
+    def __init__(self, wsgi_application, executor: ThreadPoolExecutor) -> None:
+        super().__init__(wsgi_application)
+        self.executor = executor
+
+    async def run_wsgi_app(self, body) -> None:
+        await SyncToAsync(_run_wsgi_app, thread_sensitive=False, executor=self.executor)(self, body)
+
+
+class PooledWsgiToAsgi(WsgiToAsgi):
+    """WSGI application adapted to ASGI, requests are handled in bounded thread pool
+
+    Attributes:
+        wsgi_application (Callable): WSGI application.
+        executor (ThreadPoolExecutor): Threads handling requests.
+
+    """
+
+    def __init__(self, wsgi_application, threads: int) -> None:
+        super().__init__(wsgi_application)
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="citenote-wsgi")
+
+    async def __call__(self, scope, receive, send) -> None:
+        await PooledWsgiInstance(self.wsgi_application, self.executor)(scope, receive, send)
+
+    def shutdown(self) -> None:
+        """Stops threads once running requests are finished"""
+
+        self.executor.shutdown(wait=False)
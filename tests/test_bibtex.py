@@ -0,0 +1,107 @@
+import io
+
+import pytest
+
+from server.util.bibtex import BibtexParser, format_entry
+
+
+def parse(text: str, **kwargs) -> tuple[list, list]:
+    """Parses text, returns entries and error messages"""
+
+    errors: list[str] = []
+    entries = list(BibtexParser(io.StringIO(text), on_error=errors.append, **kwargs))
+    return entries, errors
+
+
+def article(index: int) -> str:
+    return format_entry("article", f"key{index}", [("title", f"Title {index}"), ("year", "2020")])
+
+
+def test_parses_entry():
+    entries, errors = parse('@Article{vaswani2017, title = {Attention {Is} All}, year = 2017, month = jun}')
+
+    assert errors == []
+    assert entries[0].type == "article"
+    assert entries[0].key == "vaswani2017"
+    assert entries[0].fields == {"title": "Attention {Is} All", "year": "2017", "month": "June"}
+
+
+def test_string_macros_and_concatenation():
+    entries, _ = parse('@string{acl = "Proc. of ACL"}\n@inproceedings{k, booktitle = acl # " 2020"}')
+
+    assert entries[0].fields["booktitle"] == "Proc. of ACL 2020"
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ('@article{k, title = "A {B} C"}', "A {B} C"),
+        ('@article{k, title = "Quote {"}in{"} {nested {braces}}"}', 'Quote {"}in{"} {nested {braces}}'),
+        ('@article(k, title = "f(x) = y")', "f(x) = y"),
+        ('@article(k, title = "{)}")', "{)}"),
+    ],
+)
+def test_braces_inside_quoted_values(text, expected):
+    entries, errors = parse(text)
+
+    assert errors == []
+    assert entries[0].fields["title"] == expected
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 64])
+def test_entries_span_chunk_boundaries(chunk_size):
+    text = "".join(article(index) for index in range(20))
+    entries, errors = parse(text, chunk_size=chunk_size)
+
+    assert errors == []
+    assert [entry.key for entry in entries] == [f"key{index}" for index in range(20)]
+    assert entries[-1].fields["title"] == "Title 19"
+
+
+def test_unterminated_entry_before_next_entry():
+    text = "@article{broken,\n  title = {Missing end},\n" + article(1) + article(2)
+    entries, errors = parse(text, chunk_size=16)
+
+    assert [entry.key for entry in entries] == ["key1", "key2"]
+    assert len(errors) == 1
+    assert "Unterminated entry" in errors[0]
+
+
+def test_unterminated_value_is_skipped_after_max_entry_size():
+    text = "@article{broken, title = {never closed,\n" + "".join(article(index) for index in range(200))
+    entries, errors = parse(text, chunk_size=256, max_entry_size=1024)
+
+    assert len(errors) == 1
+    assert "Unterminated entry" in errors[0]
+    # Parsing resumes at the first entry after the unterminated one
+    assert [entry.key for entry in entries] == [f"key{index}" for index in range(200)]
+
+
+def test_unterminated_entry_at_end_of_stream():
+    entries, errors = parse(article(1) + "@article{broken, title = {x}")
+
+    assert [entry.key for entry in entries] == ["key1"]
+    assert len(errors) == 1
+
+
+def test_unterminated_entry_does_not_stop_large_file():
+    text = "@article{\n" + "".join(article(index) for index in range(5000))
+    entries, errors = parse(text)
+
+    assert len(entries) == 5000
+    assert len(errors) == 1
+
+
+def test_malformed_entry_is_reported_and_skipped():
+    entries, errors = parse("@article{, title = {x}}\n@article{k, title = }\n" + article(1))
+
+    assert [entry.key for entry in entries] == ["key1"]
+    assert len(errors) == 2
+
+
+def test_format_entry_round_trip():
+    text = format_entry("book", "k", [("title", "Unbalanced { brace"), ("note", ""), ("year", "1999")])
+    entries, errors = parse(text)
+
+    assert errors == []
+    assert entries[0].fields == {"title": "Unbalanced brace", "year": "1999"}
@@ -0,0 +1,122 @@
+import threading
+import time
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from server.util import hashing
+from server.util.CitenoteError import HashingBusyError
+
+
+SETTINGS = {
+    "method": "pbkdf2:sha256:1000",
+    "salt_length": 16,
+    "workers": 2,
+    "queue_size": 8,
+    "timeout": 5.0,
+}
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    """Replaces config.json settings and pool, returns settings dict to change"""
+
+    settings = dict(SETTINGS)
+    monkeypatch.setattr(hashing, "get_settings", lambda: dict(settings))
+    monkeypatch.setattr(hashing, "_pool", None)
+    return settings
+
+
+def test_gen_hash_uses_settings(settings):
+    hash = hashing.gen_hash("password")
+
+    assert hash.startswith("pbkdf2:sha256:1000$")
+    assert len(hash.split("$")[1]) == 16
+    assert hashing.check_hash("password", hash)
+    assert not hashing.check_hash("other", hash)
+    assert not hashing.needs_rehash(hash)
+
+
+@pytest.mark.parametrize(
+    "method, salt_length",
+    [
+        ("pbkdf2:sha256:2000", 16),  # more iterations
+        ("pbkdf2:sha512:1000", 16),  # other digest
+        ("sha256", 16),  # plain hmac
+        ("pbkdf2:sha256:1000", 8),  # shorter salt
+        ("pbkdf2:sha256:1000", 32),  # longer salt
+    ],
+)
+def test_needs_rehash(settings, method, salt_length):
+    hash = generate_password_hash("password", method, salt_length)
+
+    assert hashing.needs_rehash(hash)
+
+    settings["method"], settings["salt_length"] = method, salt_length
+    assert not hashing.needs_rehash(hash)
+
+
+def test_normalize_method_adds_default_iterations():
+    assert hashing.normalize_method("pbkdf2:sha256") == f"pbkdf2:sha256:{hashing.DEFAULT_PBKDF2_ITERATIONS}"
+    assert hashing.normalize_method("pbkdf2:sha256:1000") == "pbkdf2:sha256:1000"
+    assert hashing.normalize_method("scrypt") == "scrypt"
+
+
+def test_pool_raises_busy_error_after_timeout():
+    pool = hashing.HashPool(workers=1, queue_size=0, timeout=0.05)
+    started, release = threading.Event(), threading.Event()
+
+    def block():
+        started.set()
+        release.wait(5)
+
+    worker = threading.Thread(target=pool.run, args=(block,))
+    worker.start()
+    started.wait(5)
+    try:
+        with pytest.raises(HashingBusyError) as error:
+            pool.run(time.sleep, 0)
+    finally:
+        release.set()
+        worker.join()
+
+    assert error.value.retry_after == 0.05
+    assert pool.run(sum, [1, 2]) == 3
+
+
+def test_get_pool_reuses_pool_while_settings_do_not_change(settings):
+    assert hashing.get_pool() is hashing.get_pool()
+
+
+def test_get_pool_swaps_pool_while_threads_submit(settings):
+    errors: list[BaseException] = []
+    results: list[int] = []
+    pools = set()
+    stop = threading.Event()
+
+    def submit(index: int) -> None:
+        while not stop.is_set():
+            pool = hashing.get_pool()
+            pools.add(pool)
+            try:
+                results.append(pool.run(pow, index, 2))
+            except BaseException as err:
+                errors.append(err)
+
+    threads = [threading.Thread(target=submit, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+
+    for workers in (1, 3, 2, 4, 1):
+        time.sleep(0.02)
+        settings["workers"] = workers
+
+    time.sleep(0.02)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert set(results) <= {index**2 for index in range(8)}
+    assert len(pools) > 1
+    assert hashing.get_pool().workers == 1
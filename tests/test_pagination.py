@@ -0,0 +1,133 @@
+import base64
+
+import pytest
+from sqlalchemy import Float, select
+from werkzeug.exceptions import BadRequest
+
+from server.models.data_models import Paper
+from server.util.helper.helper_pagination import (
+    Ordering,
+    decode_cursor,
+    encode_cursor,
+    get_limit,
+    get_ordering,
+    is_cursor_value,
+    paginate,
+)
+
+
+NAME_ORDERING = [Ordering("name", Paper.name), Ordering("id", Paper.id)]
+SORT_FIELDS = {"name": Paper.name, "id": Paper.id}
+
+
+def raw_cursor(text: str) -> str:
+    return base64.urlsafe_b64encode(text.encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("values", [[], ["Attention", 3], [1.5, None]])
+def test_cursor_round_trip(values):
+    assert decode_cursor(encode_cursor(values)) == values
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",  # malformed base64
+        "a",  # invalid base64 length
+        base64.urlsafe_b64encode(b"\xff\xfe").decode(),  # not utf-8
+        raw_cursor("[1,"),  # malformed json
+        raw_cursor('{"id": 1}'),  # not a list
+        raw_cursor("1"),
+        raw_cursor('"name"'),
+        raw_cursor("null"),
+    ],
+)
+def test_decode_invalid_cursor(cursor):
+    with pytest.raises(BadRequest):
+        decode_cursor(cursor)
+
+
+@pytest.mark.parametrize(
+    "value, column, expected",
+    [
+        (1, Paper.id, True),
+        ("Attention", Paper.name, True),
+        ("1", Paper.id, False),
+        (1, Paper.name, False),
+        (1.5, Paper.id, False),
+        ([1], Paper.id, False),
+        (True, Paper.id, False),
+        (False, Paper.name, False),
+        (None, Paper.id, False),
+        (None, Paper.name, False),
+        (1, Paper.id.cast(Float), True),
+        (1.5, Paper.id.cast(Float), True),
+        ("1.5", Paper.id.cast(Float), False),
+    ],
+)
+def test_is_cursor_value(value, column, expected):
+    assert is_cursor_value(value, column) is expected
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        encode_cursor(["Attention"]),  # too few values
+        encode_cursor(["Attention", 3, 4]),  # too many values
+        encode_cursor([]),
+        encode_cursor([3, "Attention"]),  # wrong value types
+        encode_cursor(["Attention", True]),
+        encode_cursor([None, 3]),
+    ],
+)
+def test_paginate_rejects_cursor_not_matching_ordering(cursor):
+    with pytest.raises(BadRequest):
+        paginate(select(Paper), NAME_ORDERING, 10, cursor)
+
+
+def test_paginate_accepts_cursor_of_ordering():
+    statement = paginate(select(Paper), NAME_ORDERING, 10, encode_cursor(["Attention", 3]))
+
+    assert statement._limit == 11
+
+
+@pytest.mark.parametrize(
+    "args, expected",
+    [
+        ({}, 50),
+        ({"limit": "1"}, 1),
+        ({"limit": "20"}, 20),
+        ({"limit": "500"}, 500),
+        ({"limit": "10000"}, 500),
+    ],
+)
+def test_get_limit(args, expected):
+    assert get_limit(args=args) == expected
+
+
+@pytest.mark.parametrize("limit", ["0", "-1", "", "ten", "1.5", "1e3"])
+def test_get_limit_rejects_invalid_limit(limit):
+    with pytest.raises(BadRequest):
+        get_limit(args={"limit": limit})
+
+
+@pytest.mark.parametrize(
+    "args, expected",
+    [
+        ({}, [("name", False), ("id", False)]),
+        ({"sort": "name"}, [("name", False), ("id", False)]),
+        ({"sort": "-name"}, [("name", True), ("id", True)]),
+        ({"sort": "id"}, [("id", False)]),
+        ({"sort": "-id"}, [("id", True)]),
+    ],
+)
+def test_get_ordering(args, expected):
+    ordering = get_ordering(SORT_FIELDS, "name", NAME_ORDERING[1], args=args)
+
+    assert [(order.name, order.descending) for order in ordering] == expected
+
+
+@pytest.mark.parametrize("sort", ["abstract", "-abstract", "", "-", "--name", "name "])
+def test_get_ordering_rejects_unknown_field(sort):
+    with pytest.raises(BadRequest):
+        get_ordering(SORT_FIELDS, "name", NAME_ORDERING[1], args={"sort": sort})
@@ -0,0 +1,97 @@
+import os
+import uuid
+
+import pytest
+from sqlalchemy import delete, insert, text
+from sqlalchemy.exc import OperationalError
+
+from server.models.base import db
+from server.models.data_models import Manuscript, Paper, manuscript_paper
+from server.util.queries import count_queries
+
+
+PAPERS = 3
+
+
+@pytest.fixture(scope="module")
+def app():
+    """Application on the database configured in config.json, tests are skipped without one"""
+
+    if not os.path.exists("config.json"):
+        pytest.skip("config.json is not present")
+
+    from server import create_app
+
+    app = create_app()
+    with app.app_context():
+        try:
+            db.session.execute(text("SELECT 1"))
+        except OperationalError as err:
+            pytest.skip(f"database is not reachable: {err.orig}")
+        finally:
+            db.session.rollback()
+
+    return app
+
+
+@pytest.fixture
+def manuscript_id(app):
+    """Manuscript with associated papers, removed after the test"""
+
+    prefix = f"test-queries-{uuid.uuid4().hex}"
+    with app.app_context():
+        manuscript = Manuscript(prefix, None)
+        papers = [Paper(f"{prefix}-{index}", None) for index in range(PAPERS)]
+        db.session.add_all([manuscript, *papers])
+        db.session.flush()
+        db.session.execute(
+            insert(manuscript_paper), [{"manuscript_id": manuscript.id, "paper_id": paper.id} for paper in papers]
+        )
+        db.session.commit()
+        manuscript_id, paper_ids = manuscript.id, [paper.id for paper in papers]
+
+    yield manuscript_id
+
+    with app.app_context():
+        db.session.execute(delete(manuscript_paper).where(manuscript_paper.c.manuscript_id == manuscript_id))
+        db.session.execute(delete(Paper).where(Paper.id.in_(paper_ids)))
+        db.session.execute(delete(Manuscript).where(Manuscript.id == manuscript_id))
+        db.session.commit()
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("", 2),  # manuscript lookup and one join over manuscripts_papers
+        ("?limit=1", 2),
+        ("?sort=-name", 2),
+        ("?count=true", 3),
+    ],
+)
+def test_manuscript_papers_query_count(app, manuscript_id, query, expected):
+    client = app.test_client()
+
+    with count_queries() as stats:
+        response = client.get(f"/manuscripts/{manuscript_id}/add_paper/{query}")
+
+    assert response.status_code == 200
+    assert stats.count == expected, list(stats.statements)
+    assert all(count == 1 for count in stats.statements.values())
+
+
+def test_manuscript_papers_query_count_does_not_grow_with_papers(app, manuscript_id):
+    client = app.test_client()
+
+    with count_queries() as stats:
+        response = client.get(f"/manuscripts/{manuscript_id}/add_paper/")
+
+    assert response.json["count"] == PAPERS
+    assert stats.count == 2
+
+
+def test_unknown_manuscript_query_count(app):
+    with count_queries() as stats:
+        response = app.test_client().get("/manuscripts/0/add_paper/")
+
+    assert response.status_code == 404
+    assert stats.count == 1
@@ -0,0 +1,57 @@
+import pytest
+import yaml
+
+from server.util.CitenoteError import MissingFieldsError, UnknownCitationTypeError
+from server.util.schemas import compile_schemas, get_schema
+
+
+with open("papers.yaml", encoding="utf-8") as file:
+    SCHEMAS = compile_schemas(yaml.safe_load(file))
+
+
+def test_returns_values_by_column():
+    values = SCHEMAS["article"].validate(
+        {"author": "Vaswani", "journal": "NeurIPS", "year": "2017", "note": "Oral", "unknown": "ignored"}
+    )
+
+    assert values == {"author": "Vaswani", "journal": "NeurIPS", "year": "2017", "note": "Oral"}
+
+
+def test_common_fields_are_optional_for_every_type():
+    for schema in SCHEMAS.values():
+        assert {"note", "annote", "crossref"} <= schema.optional
+
+
+def test_missing_required_fields():
+    with pytest.raises(MissingFieldsError) as error:
+        SCHEMAS["article"].validate({"author": "Vaswani"})
+
+    assert "journal, year" in str(error.value)
+
+
+@pytest.mark.parametrize("empty", ["", None])
+def test_empty_values_are_missing(empty):
+    with pytest.raises(MissingFieldsError) as error:
+        SCHEMAS["article"].validate({"author": "Vaswani", "journal": empty, "year": "2017", "volume": empty})
+
+    assert "journal" in str(error.value)
+    assert "volume" not in str(error.value)
+
+
+@pytest.mark.parametrize("citation_type", ["phdthesis", "mastersthesis"])
+def test_thesis_type_has_no_column(citation_type):
+    schema = SCHEMAS[citation_type]
+    values = schema.validate({"author": "Turing", "school": "Princeton", "year": "1938", "type": "PhD dissertation"})
+
+    assert "type" in schema.optional
+    assert "type" not in schema.columns
+    assert values == {"author": "Turing", "school": "Princeton", "year": "1938"}
+
+
+def test_type_is_case_insensitive():
+    assert get_schema("Article").type == "article"
+
+
+def test_unknown_type():
+    with pytest.raises(UnknownCitationTypeError):
+        get_schema("podcast")
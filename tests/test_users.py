@@ -0,0 +1,86 @@
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask
+
+from server import error_handler, unavailable_handler
+from server.util.CitenoteError import HashingBusyError
+from server.util.helper import helper_users
+
+
+HASH = "pbkdf2:sha256:1000$salt$hash"
+
+
+@pytest.fixture
+def app(monkeypatch):
+    """Flask app with login route, user lookup and hashing replaced"""
+
+    user = SimpleNamespace(username="turing", role="guest", password=HASH, last_login=None)
+    monkeypatch.setattr(helper_users, "get_user", lambda username: user if username == user.username else None)
+    monkeypatch.setattr(helper_users, "citenote_check_hash", lambda password, hash: password == "secret")
+    monkeypatch.setattr(helper_users, "citenote_needs_rehash", lambda hash: False)
+    monkeypatch.setattr(helper_users, "db", SimpleNamespace(session=SimpleNamespace(commit=lambda: None)))
+
+    app = Flask(__name__)
+    app.secret_key = "test"
+    app.user = user
+    app.register_error_handler(400, error_handler)
+    app.register_error_handler(503, unavailable_handler)
+
+    @app.route("/login")
+    @helper_users.users_operations
+    def login():
+        return helper_users.users_login, "login"
+
+    return app
+
+
+def busy(*args):
+    raise HashingBusyError(2.5)
+
+
+def test_login(app):
+    response = app.test_client().get("/login?username=turing&password=secret")
+
+    assert response.status_code == 200
+    assert response.json == {"check": "login successful"}
+    assert app.user.last_login is not None
+
+
+def test_login_wrong_password(app):
+    response = app.test_client().get("/login?username=turing&password=wrong")
+
+    assert response.status_code == 400
+    assert response.json == {"check": "login unsuccessful"}
+
+
+def test_busy_hashing_answers_503_with_retry_after(app, monkeypatch):
+    monkeypatch.setattr(helper_users, "citenote_check_hash", busy)
+
+    response = app.test_client().get("/login?username=turing&password=secret")
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "3"
+    assert response.json["status"] == 503
+    assert app.user.last_login is None
+
+
+def test_busy_rehash_keeps_old_hash(app, monkeypatch):
+    monkeypatch.setattr(helper_users, "citenote_needs_rehash", lambda hash: True)
+    monkeypatch.setattr(helper_users, "citenote_gen_hash", busy)
+
+    response = app.test_client().get("/login?username=turing&password=secret")
+
+    assert response.status_code == 200
+    assert app.user.password == HASH
+    assert app.user.last_login is not None
+
+
+def test_rehash(app, monkeypatch):
+    monkeypatch.setattr(helper_users, "citenote_needs_rehash", lambda hash: True)
+    monkeypatch.setattr(helper_users, "citenote_gen_hash", lambda password: "pbkdf2:sha256:2000$new$hash")
+
+    response = app.test_client().get("/login?username=turing&password=secret")
+
+    assert response.status_code == 200
+    assert app.user.password == "pbkdf2:sha256:2000$new$hash"
@@ -0,0 +1,79 @@
+import asyncio
+import threading
+
+import pytest
+from flask import Flask
+
+from server.util.wsgi import PooledWsgiToAsgi
+
+
+def create_app(barrier: threading.Barrier, threads: list) -> Flask:
+    """Flask app whose route returns only once two requests are handled at the same time"""
+
+    app = Flask(__name__)
+
+    @app.route("/wait")
+    def wait():
+        threads.append(threading.current_thread().name)
+        barrier.wait()
+        return {"ok": True}
+
+    return app
+
+
+async def get(app, path: str) -> int:
+    """Sends GET request to ASGI app, returns response status"""
+
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "server": ("localhost", 80),
+        "client": ("127.0.0.1", 50000),
+    }
+    await app(scope, receive, send)
+    return messages[0]["status"]
+
+
+async def get_concurrently(app, count: int) -> list:
+    return await asyncio.gather(*(get(app, "/wait") for _ in range(count)))
+
+
+@pytest.mark.parametrize("threads", [2, 4])
+def test_concurrent_requests_overlap(threads):
+    names: list[str] = []
+    app = PooledWsgiToAsgi(create_app(threading.Barrier(2, timeout=5), names), threads)
+    try:
+        statuses = asyncio.run(get_concurrently(app, 2))
+    finally:
+        app.shutdown()
+
+    assert statuses == [200, 200]
+    assert len(set(names)) == 2
+    assert all(name.startswith("citenote-wsgi") for name in names)
+
+
+def test_requests_wait_for_free_thread():
+    names: list[str] = []
+    app = PooledWsgiToAsgi(create_app(threading.Barrier(2, timeout=0.2), names), 1)
+    try:
+        statuses = asyncio.run(get_concurrently(app, 2))
+    finally:
+        app.shutdown()
+
+    # Second request starts only after the first gave up waiting for it
+    assert statuses == [500, 500]
+    assert len(set(names)) == 1